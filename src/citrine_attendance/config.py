@@ -1,10 +1,16 @@
 # src/citrine_attendance/config.py
 import os
-import appdirs
+import functools
 import json
 import logging
+import tempfile
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib json module is used otherwise
+    orjson = None
+
 # --- Application Metadata ---
 APP_NAME = "ZarsahamAttendance"
 APP_AUTHOR = "Zarsaham" # Or your name/company
@@ -35,27 +41,57 @@ DEFAULT_SETTINGS = {
     "holidays": ["09-03", "10-13", "10-27", "11-15", "11-22", "12-20", "12-29"],
 }
 
+# Directories already created and secured in this process
+_ensured: set[Path] = set()
+
+def _ensure(directory: Path):
+    """Create `directory` with 0700 permissions once per process."""
+    if directory in _ensured:
+        return
+    try:
+        # Warm start: directory already exists with the right permissions
+        if (directory.stat().st_mode & 0o777) == 0o700:
+            _ensured.add(directory)
+            return
+    except FileNotFoundError:
+        pass
+    directory.mkdir(parents=True, exist_ok=True)
+    try:
+        os.chmod(directory, 0o700)
+    except Exception as e:
+        logging.warning(f"Could not set permissions on {directory}: {e}")
+    _ensured.add(directory)
+
 class AppConfig:
     def __init__(self):
-        self.app_dirs = appdirs.AppDirs(APP_NAME, APP_AUTHOR)
-        self.user_data_dir = Path(self.app_dirs.user_data_dir)
+        self._cached_mtime = None
+        self._cached_settings = None
+        self._settings_listeners = []
         self.ensure_directories_exist()
-        self.settings_file = self.user_data_dir / "settings.json"
         self.load_settings()
 
+    # Platform path resolution (and the appdirs import) happens on first access only
+    @functools.cached_property
+    def app_dirs(self):
+        import appdirs
+        return appdirs.AppDirs(APP_NAME, APP_AUTHOR)
+
+    @functools.cached_property
+    def user_data_dir(self) -> Path:
+        return Path(self.app_dirs.user_data_dir)
+
+    @functools.cached_property
+    def settings_file(self) -> Path:
+        return self.user_data_dir / "settings.json"
+
     def ensure_directories_exist(self):
         """Create necessary directories if they don't exist."""
-        directories = [
+        for directory in (
             self.user_data_dir,
             self.user_data_dir / "backups",
             self.user_data_dir / "logs"
-        ]
-        for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
-            try:
-                os.chmod(directory, 0o700)
-            except Exception as e:
-                logging.warning(f"Could not set permissions on {directory}: {e}")
+        ):
+            _ensure(directory)
 
     def get_db_path(self):
         """Get the path to the SQLite database file."""
@@ -63,36 +99,105 @@ class AppConfig:
             return Path(self.settings["db_path_override"])
         return self.user_data_dir / "attendance.db"
 
-    def load_settings(self):
-        """Load settings from file, or use defaults."""
-        if self.settings_file.exists():
+    def add_settings_listener(self, callback):
+        """Call `callback()` whenever the settings are saved or re-read from a changed file."""
+        self._settings_listeners.append(callback)
+
+    def _notify_settings_changed(self):
+        for callback in self._settings_listeners:
             try:
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    loaded_settings = json.load(f)
-                    self.settings = {**DEFAULT_SETTINGS, **loaded_settings}
-            except (json.JSONDecodeError, IOError) as e:
-                logging.error(f"Error loading settings: {e}. Using defaults.")
-                self.settings = DEFAULT_SETTINGS.copy()
-        else:
+                callback()
+            except Exception as e:
+                logging.error(f"Settings listener {callback!r} failed: {e}")
+
+    def load_settings(self):
+        """Load settings from file, or use defaults.
+
+        The parsed settings are cached together with the file's mtime, so a
+        repeated call only costs a stat() unless the file changed on disk.
+        """
+        try:
+            mtime = os.stat(self.settings_file).st_mtime_ns
+        except FileNotFoundError:
             self.settings = DEFAULT_SETTINGS.copy()
             self.save_settings()
+            return self.settings
+        except OSError as e:
+            logging.error(f"Error reading settings file: {e}. Using defaults.")
+            self.settings = DEFAULT_SETTINGS.copy()
+            return self.settings
+
+        if self._cached_settings is not None and mtime == self._cached_mtime:
+            self.settings = self._cached_settings
+            return self.settings
+
+        try:
+            with open(self.settings_file, 'rb') as f:
+                raw = f.read()
+            loaded_settings = orjson.loads(raw) if orjson else json.loads(raw.decode('utf-8'))
+            self.settings = DEFAULT_SETTINGS.copy()
+            self.settings.update(loaded_settings)
+            self._cached_settings = self.settings
+            self._cached_mtime = mtime
+        except (ValueError, IOError) as e:
+            logging.error(f"Error loading settings: {e}. Using defaults.")
+            self.settings = DEFAULT_SETTINGS.copy()
+        self._notify_settings_changed()
+        return self.settings
 
     def save_settings(self):
-        """Save current settings to file."""
+        """Save current settings to file atomically (write temp file, then replace)."""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4, ensure_ascii=False)
-        except IOError as e:
+            fd, tmp_path = tempfile.mkstemp(dir=self.settings_file.parent, prefix=".settings-", suffix=".tmp")
+            try:
+                if orjson:
+                    data = orjson.dumps(self.settings, option=orjson.OPT_INDENT_2)
+                else:
+                    data = json.dumps(self.settings, indent=4, ensure_ascii=False).encode('utf-8')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.settings_file)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self._cached_settings = self.settings
+            self._cached_mtime = os.stat(self.settings_file).st_mtime_ns
+        except (IOError, OSError) as e:
             logging.error(f"Error saving settings: {e}")
+        # The in-memory settings are what the app uses, even if the write failed
+        self._notify_settings_changed()
 
     def update_setting(self, key, value):
         """Update a setting and save."""
-        if key in self.settings or key in DEFAULT_SETTINGS:
-            self.settings[key] = value
+        self.update_settings({key: value})
+
+    def update_settings(self, updates):
+        """Update several settings and save them with a single write."""
+        changed = False
+        for key, value in updates.items():
+            if key in self.settings or key in DEFAULT_SETTINGS:
+                self.settings[key] = value
+                changed = True
+            else:
+                logging.warning(f"Attempted to update unknown setting key: {key}")
+        if changed:
             self.save_settings()
-        else:
-            logging.warning(f"Attempted to update unknown setting key: {key}")
 
+# Global config instance, created on first use rather than at import time
+_instance = None
+
+def get_config():
+    """Return the shared AppConfig, creating it on first call."""
+    global _instance
+    if _instance is None:
+        _instance = AppConfig()
+    return _instance
 
-# Global config instance
-config = AppConfig()
\ No newline at end of file
+def __getattr__(name):
+    # Keeps `from .config import config` working while deferring construction
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
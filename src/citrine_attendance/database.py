@@ -1,187 +1,377 @@
 # src/citrine_attendance/database.py
+import contextlib
 import logging
+import sqlite3
+from typing import List, Optional
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Text, DateTime, Date, Time,
+    create_engine, Integer, String, Text, DateTime, Date,
     Boolean, ForeignKey, Index, event, inspect, text
 )
-from sqlalchemy.orm import sessionmaker, relationship
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.orm import sessionmaker, relationship, DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.sql import func
+from sqlalchemy.dialects.sqlite import TIME as SQLITE_TIME
 import datetime
-from .config import config
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    pass
+
+
+class FastTime(SQLITE_TIME):
+    """SQLite TIME column parsed with the C-level datetime.time.fromisoformat.
+
+    Storage is unchanged ('HH:MM:SS.ffffff' text); only the per-row result
+    conversion skips SQLAlchemy's regex-based parser. Values fromisoformat
+    rejects fall back to the stock processor.
+    """
+    cache_ok = True
+
+    def result_processor(self, dialect, coltype):
+        fallback = super().result_processor(dialect, coltype)
+        fromisoformat = datetime.time.fromisoformat
+
+        def process(value):
+            if value is None:
+                return None
+            try:
+                return fromisoformat(value)
+            except (TypeError, ValueError):
+                return fallback(value)
+        return process
+
 
 class Employee(Base):
     __tablename__ = 'employees'
-    id = Column(Integer, primary_key=True)
-    employee_id = Column(String, unique=True, nullable=True)
-    first_name = Column(String, nullable=False)
-    last_name = Column(String, nullable=True)
-    email = Column(String, unique=True, nullable=False)
-    phone = Column(String, nullable=True)
-    notes = Column(Text, nullable=True)
+    # Fetch updated_at (onupdate) with RETURNING, so it is not left expired after
+    # commit on sessions that outlive the update (expire_on_commit=False)
+    __mapper_args__ = {"eager_defaults": True}
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    employee_id: Mapped[Optional[str]] = mapped_column(String, unique=True, nullable=True)
+    first_name: Mapped[str] = mapped_column(String, nullable=False)
+    last_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    email: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    phone: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     # HEROIC FIX: Added monthly leave allowance in minutes
-    monthly_leave_allowance_minutes = Column(Integer, nullable=False, default=0, server_default="0")
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
-    attendance_records = relationship("Attendance", back_populates="employee", cascade="all, delete-orphan")
+    monthly_leave_allowance_minutes: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+    attendance_records: Mapped[List["Attendance"]] = relationship(back_populates="employee", cascade="all, delete-orphan")
 
 class Attendance(Base):
     __tablename__ = 'attendance'
-    id = Column(Integer, primary_key=True)
-    employee_id = Column(Integer, ForeignKey('employees.id', ondelete='CASCADE'), nullable=False)
-    date = Column(Date, nullable=False)
-    time_in = Column(Time, nullable=True)
-    time_out = Column(Time, nullable=True)
+    # Fetch created_at/updated_at with RETURNING on INSERT/UPDATE, so records stay
+    # complete after commit without a session.refresh() round-trip
+    __mapper_args__ = {"eager_defaults": True}
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    employee_id: Mapped[int] = mapped_column(Integer, ForeignKey('employees.id', ondelete='CASCADE'), nullable=False)
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    time_in: Mapped[Optional[datetime.time]] = mapped_column(FastTime, nullable=True)
+    time_out: Mapped[Optional[datetime.time]] = mapped_column(FastTime, nullable=True)
     # --- Second Time In/Out Fields ---
-    time_in_2 = Column(Time, nullable=True)
-    time_out_2 = Column(Time, nullable=True)
+    time_in_2: Mapped[Optional[datetime.time]] = mapped_column(FastTime, nullable=True)
+    time_out_2: Mapped[Optional[datetime.time]] = mapped_column(FastTime, nullable=True)
 
     # --- Leave Time Fields ---
-    leave_start = Column(Time, nullable=True)
-    leave_end = Column(Time, nullable=True)
+    leave_start: Mapped[Optional[datetime.time]] = mapped_column(FastTime, nullable=True)
+    leave_end: Mapped[Optional[datetime.time]] = mapped_column(FastTime, nullable=True)
 
     # --- Derived/Calculated Fields ---
-    duration_minutes = Column(Integer, nullable=True)
-    launch_duration_minutes = Column(Integer, nullable=True)
-    leave_duration_minutes = Column(Integer, nullable=True) # New column for leave duration
-    tardiness_minutes = Column(Integer, nullable=True)
+    duration_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    launch_duration_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    leave_duration_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True) # New column for leave duration
+    tardiness_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     # HEROIC FIX: Added early_departure_minutes for "Ta'jil"
-    early_departure_minutes = Column(Integer, nullable=True)
-    main_work_minutes = Column(Integer, nullable=True)
-    overtime_minutes = Column(Integer, nullable=True)
-    status = Column(String, nullable=False)
-    note = Column(Text, nullable=True)
-    created_by = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
-    is_archived = Column(Boolean, default=False, nullable=False)
-    employee = relationship("Employee", back_populates="attendance_records")
+    early_departure_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    main_work_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    overtime_minutes: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    note: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
+    updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp(), onupdate=func.current_timestamp())
+    is_archived: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Lazy by default; queries that touch .employee for many rows must add
+    # .options(selectinload(Attendance.employee)) to avoid one SELECT per row.
+    employee: Mapped["Employee"] = relationship(back_populates="attendance_records")
 
 Index('idx_attendance_employee_id', Attendance.employee_id)
 Index('idx_attendance_date', Attendance.date)
 Index('idx_attendance_date_employee', Attendance.date, Attendance.employee_id)
+# Per-employee date-range lookups (reports, monthly leave totals, clock in/out)
+Index('idx_attendance_employee_date', Attendance.employee_id, Attendance.date)
+# Daily summary counts by status
+Index('idx_attendance_date_status', Attendance.date, Attendance.status)
+# Partial index over archived rows for the archive view, newest first
+Index(
+    'idx_attendance_archived_date_emp', Attendance.date, Attendance.employee_id,
+    sqlite_where=(Attendance.is_archived == True),
+)
 
 class BackupRecord(Base):
     __tablename__ = 'backups'
-    id = Column(Integer, primary_key=True)
-    file_name = Column(String, nullable=False)
-    file_path = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    size_bytes = Column(Integer, nullable=False)
-    encrypted = Column(Boolean, default=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    file_name: Mapped[str] = mapped_column(String, nullable=False)
+    file_path: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    encrypted: Mapped[Optional[bool]] = mapped_column(Boolean, default=False)
 
 class User(Base):
-     __tablename__ = 'users'
-     id = Column(Integer, primary_key=True)
-     username = Column(String, unique=True, nullable=False)
-     password_hash = Column(String, nullable=False)
-     role = Column(String, nullable=False) # 'admin', 'operator'
-     created_at = Column(DateTime, default=datetime.datetime.utcnow)
-     last_login = Column(DateTime, nullable=True)
+    __tablename__ = 'users'
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    username: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    password_hash: Mapped[str] = mapped_column(String, nullable=False)
+    role: Mapped[str] = mapped_column(String, nullable=False) # 'admin', 'operator'
+    created_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
+    last_login: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True)
 
 class AuditLog(Base):
     __tablename__ = 'audit_log'
-    id = Column(Integer, primary_key=True)
-    table_name = Column(String, nullable=False)
-    record_id = Column(Integer, nullable=False)
-    action = Column(String, nullable=False)
-    changes_json = Column(Text, nullable=True)
-    performed_by = Column(String, nullable=False)
-    performed_at = Column(DateTime, default=datetime.datetime.utcnow)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String, nullable=False)
+    record_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    action: Mapped[str] = mapped_column(String, nullable=False)
+    changes_json: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    performed_by: Mapped[str] = mapped_column(String, nullable=False)
+    performed_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, default=func.current_timestamp(), server_default=func.current_timestamp())
 
 engine = None
 SessionLocal = None
 
+# Stored in the SQLite header (PRAGMA user_version) once create_all() and the
+# migrations in init_db() have succeeded. Bump it whenever the models, indexes
+# or migrations change so existing databases go through that path again.
+SCHEMA_VERSION = 6
+
+# --- Schema migrations, built once at import ---
+# Columns added to existing tables after their first release, keyed by column name.
+_ATTENDANCE_MIGRATIONS = {
+    # NOT NULL DEFAULT 0 matches the model, so migrated rows are never NULL
+    "is_archived": text("ALTER TABLE attendance ADD COLUMN is_archived BOOLEAN NOT NULL DEFAULT 0"),
+    "leave_start": text("ALTER TABLE attendance ADD COLUMN leave_start TIME"),
+    "leave_end": text("ALTER TABLE attendance ADD COLUMN leave_end TIME"),
+    "leave_duration_minutes": text("ALTER TABLE attendance ADD COLUMN leave_duration_minutes INTEGER"),
+    "launch_duration_minutes": text("ALTER TABLE attendance ADD COLUMN launch_duration_minutes INTEGER"),
+    "tardiness_minutes": text("ALTER TABLE attendance ADD COLUMN tardiness_minutes INTEGER"),
+    "main_work_minutes": text("ALTER TABLE attendance ADD COLUMN main_work_minutes INTEGER"),
+    "overtime_minutes": text("ALTER TABLE attendance ADD COLUMN overtime_minutes INTEGER"),
+    # HEROIC FIX: Added migration for early_departure_minutes
+    "early_departure_minutes": text("ALTER TABLE attendance ADD COLUMN early_departure_minutes INTEGER"),
+    # HEROIC IMPLEMENTATION: Added migration for second time in/out
+    "time_in_2": text("ALTER TABLE attendance ADD COLUMN time_in_2 TIME"),
+    "time_out_2": text("ALTER TABLE attendance ADD COLUMN time_out_2 TIME"),
+}
+
+# Old launch_* column names, keyed by old name
+_ATTENDANCE_RENAMES = {
+    "launch_start": text("ALTER TABLE attendance RENAME COLUMN launch_start TO leave_start"),
+    "launch_end": text("ALTER TABLE attendance RENAME COLUMN launch_end TO leave_end"),
+}
+
+# Indexes removed from the models; dropped from databases that still have them
+_DROPPED_INDEXES = (
+    # The planner preferred idx_attendance_date for every listing, so it only cost writes
+    "idx_attendance_active_date_emp",
+)
+
+_EMPLOYEE_MIGRATIONS = {
+    "monthly_leave_allowance_minutes": text(
+        "ALTER TABLE employees ADD COLUMN monthly_leave_allowance_minutes INTEGER NOT NULL DEFAULT 0"
+    ),
+}
+
 def get_database_url():
-    db_path = config.get_db_path()
+    # Imported here so importing this module never builds the app config
+    from .config import get_config
+    db_path = get_config().get_db_path()
     return f"sqlite:///{db_path}"
 
+def _pool_options():
+    """Keep a small pool of open connections when the sqlite3 module allows sharing them across threads."""
+    if sqlite3.threadsafety >= 2:
+        return {
+            "poolclass": QueuePool,
+            "pool_size": 5,
+            "max_overflow": 10,
+            # A local file connection never goes stale, so skip the ping per
+            # checkout and keep connections (and their PRAGMAs) for the whole run.
+            "pool_recycle": -1,
+            "pool_pre_ping": False,
+        }
+    return {"poolclass": NullPool}
+
 def init_db():
     global engine, SessionLocal
     database_url = get_database_url()
     logging.info(f"Initializing database at: {database_url}")
     try:
-        engine = create_engine(database_url, echo=False, connect_args={"check_same_thread": False})
-        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        engine = create_engine(
+            database_url,
+            echo=False,
+            connect_args={"check_same_thread": False},
+            **_pool_options(),
+            # Compiled-SQL cache entries; the default 500 is shared by every
+            # query()/select() shape in the services and views, so give it headroom
+            query_cache_size=1200,
+            # Rows per multi-VALUES INSERT when executing insert(Model) with a list of dicts
+            insertmanyvalues_page_size=1000,
+        )
+        # Loaded objects stay usable after commit/close without a reload per attribute;
+        # database-side values come back via eager_defaults (Attendance) or session.refresh().
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
         @event.listens_for(engine, "connect")
         def set_sqlite_pragma(dbapi_connection, connection_record):
             cursor = dbapi_connection.cursor()
             cursor.execute("PRAGMA foreign_keys=ON")
+            # NORMAL sync is crash-safe in WAL mode for a single-user desktop DB.
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+            cursor.execute("PRAGMA mmap_size=268435456")
+            # Wait for a concurrent writer instead of failing with "database is locked"
+            cursor.execute("PRAGMA busy_timeout=5000")
+            # Checkpoint every ~40 MB of WAL instead of every 1000 pages so bulk
+            # imports are not interrupted by frequent checkpoints
+            cursor.execute("PRAGMA wal_autocheckpoint=10000")
             cursor.close()
 
+        @event.listens_for(engine, "close")
+        def optimize_on_close(dbapi_connection, connection_record):
+            try:
+                dbapi_connection.execute("PRAGMA optimize")
+            except Exception as e:
+                logging.debug(f"PRAGMA optimize skipped: {e}")
+
+        # WAL lets readers run while a write commits and cuts fsyncs per commit.
+        # The journal mode is stored in the database file, so it is set once here
+        # rather than on every connection; in-memory databases cannot use it.
+        with engine.connect() as connection:
+            if engine.url.database not in (None, "", ":memory:"):
+                connection.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+            # Fast path: a database already at this schema version needs no reflection
+            current_version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+            if current_version == SCHEMA_VERSION:
+                logging.info(f"Database schema is up to date (version {SCHEMA_VERSION}).")
+                return
+            is_new_database = connection.exec_driver_sql("SELECT count(*) FROM sqlite_master").scalar() == 0
+
         Base.metadata.create_all(bind=engine)
         logging.info("Database tables created/verified.")
 
+        if is_new_database:
+            # create_all() just built the current schema, indexes included
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            logging.info("New database created; no migrations needed.")
+            return
+
         # --- MIGRATION ---
-        inspector = inspect(engine)
-        with engine.connect() as connection:
-            # --- Attendance Table Migrations ---
-            if inspector.has_table('attendance'):
-                attendance_columns = [column['name'] for column in inspector.get_columns('attendance')]
-                
-                migrations = {
-                    "leave_start": "ALTER TABLE attendance ADD COLUMN leave_start TIME",
-                    "leave_end": "ALTER TABLE attendance ADD COLUMN leave_end TIME",
-                    "leave_duration_minutes": "ALTER TABLE attendance ADD COLUMN leave_duration_minutes INTEGER",
-                    "launch_duration_minutes": "ALTER TABLE attendance ADD COLUMN launch_duration_minutes INTEGER",
-                    "tardiness_minutes": "ALTER TABLE attendance ADD COLUMN tardiness_minutes INTEGER",
-                    "main_work_minutes": "ALTER TABLE attendance ADD COLUMN main_work_minutes INTEGER",
-                    "overtime_minutes": "ALTER TABLE attendance ADD COLUMN overtime_minutes INTEGER",
-                    # HEROIC FIX: Added migration for early_departure_minutes
-                    "early_departure_minutes": "ALTER TABLE attendance ADD COLUMN early_departure_minutes INTEGER",
-                    # HEROIC IMPLEMENTATION: Added migration for second time in/out
-                    "time_in_2": "ALTER TABLE attendance ADD COLUMN time_in_2 TIME",
-                    "time_out_2": "ALTER TABLE attendance ADD COLUMN time_out_2 TIME"
-                }
-                
-                if 'launch_start' in attendance_columns and 'leave_start' not in attendance_columns:
-                    logging.warning("Migrating database: renaming 'launch_start' to 'leave_start'.")
-                    connection.execute(text("ALTER TABLE attendance RENAME COLUMN launch_start TO leave_start"))
-                if 'launch_end' in attendance_columns and 'leave_end' not in attendance_columns:
-                    logging.warning("Migrating database: renaming 'launch_end' to 'leave_end'.")
-                    connection.execute(text("ALTER TABLE attendance RENAME COLUMN launch_end TO leave_end"))
-                
-                for col_name, alter_sql in migrations.items():
-                    attendance_columns_refreshed = [c['name'] for c in inspector.get_columns('attendance')]
-                    if col_name not in attendance_columns_refreshed:
-                        logging.warning(f"Migrating database: Adding '{col_name}' column to attendance.")
-                        try:
-                            trans = connection.begin()
-                            connection.execute(text(alter_sql))
-                            trans.commit()
-                            logging.info(f"Successfully added '{col_name}' column.")
-                        except Exception as e:
-                            if trans: trans.rollback()
-                            logging.critical(f"Failed to add '{col_name}': {e}")
-
-            # --- Employee Table Migrations (HEROIC FIX) ---
-            if inspector.has_table('employees'):
-                employee_columns = [column['name'] for column in inspector.get_columns('employees')]
-                if 'monthly_leave_allowance_minutes' not in employee_columns:
-                    logging.warning("Migrating database: Adding 'monthly_leave_allowance_minutes' column to employees.")
-                    try:
-                        trans = connection.begin()
-                        connection.execute(text("ALTER TABLE employees ADD COLUMN monthly_leave_allowance_minutes INTEGER NOT NULL DEFAULT 0"))
-                        trans.commit()
-                        logging.info("Successfully added 'monthly_leave_allowance_minutes' column.")
-                    except Exception as e:
-                        if trans: trans.rollback()
-                        logging.critical(f"Failed to add 'monthly_leave_allowance_minutes': {e}")
+        # One connection and one inspector serve the whole block. The column changes,
+        # the index creation and the user_version write share one explicit transaction,
+        # so they commit together when it exits or roll back as a unit on failure.
+        try:
+            with engine.begin() as connection:
+                # pysqlite only opens a transaction implicitly before DML, so without
+                # an explicit BEGIN every ALTER TABLE below would autocommit on its own.
+                connection.exec_driver_sql("BEGIN")
+                inspector = inspect(connection)
+
+                # --- Attendance Table Migrations ---
+                if inspector.has_table('attendance'):
+                    attendance_columns = [column['name'] for column in inspector.get_columns('attendance')]
+
+                    # Columns are tracked locally instead of re-running PRAGMA table_info per candidate
+                    have = set(attendance_columns)
+
+                    renames = []
+                    if 'launch_start' in have and 'leave_start' not in have:
+                        renames.append(('launch_start', 'leave_start'))
+                    if 'launch_end' in have and 'leave_end' not in have:
+                        renames.append(('launch_end', 'leave_end'))
+                    for old_name, new_name in renames:
+                        have.discard(old_name)
+                        have.add(new_name)
+
+                    for old_name, new_name in renames:
+                        logging.warning(f"Migrating database: renaming '{old_name}' to '{new_name}'.")
+                        connection.execute(_ATTENDANCE_RENAMES[old_name])
+                    for col_name, stmt in _ATTENDANCE_MIGRATIONS.items():
+                        if col_name not in have:
+                            logging.warning(f"Migrating database: Adding '{col_name}' column to attendance.")
+                            connection.execute(stmt)
+
+                # --- Employee Table Migrations (HEROIC FIX) ---
+                if inspector.has_table('employees'):
+                    employee_columns = [column['name'] for column in inspector.get_columns('employees')]
+                    for col_name, stmt in _EMPLOYEE_MIGRATIONS.items():
+                        if col_name not in employee_columns:
+                            logging.warning(f"Migrating database: Adding '{col_name}' column to employees.")
+                            connection.execute(stmt)
+
+                for index_name in _DROPPED_INDEXES:
+                    connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index_name}")
+
+                # create_all() only builds indexes together with a new table, so make sure
+                # indexes added in later versions also exist on upgraded databases.
+                for table in Base.metadata.sorted_tables:
+                    for index in table.indexes:
+                        index.create(bind=connection, checkfirst=True)
+
+                connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            logging.info("Database schema migrations verified.")
+        except Exception as e:
+            logging.critical(f"Failed to migrate database schema, changes rolled back: {e}")
 
     except Exception as e:
         logging.critical(f"Failed to initialize database: {e}")
         raise
 
-def get_db_session():
+def checkpoint_wal():
+    """
+    Fold the WAL file back into the main database file, e.g. before copying it.
+    Returns SQLite's (busy, log, checkpointed) result: the checkpoint is complete
+    only when busy is 0 and every log frame was checkpointed. None before init_db().
+    """
+    if engine is None:
+        return None
+    with engine.connect() as connection:
+        return tuple(connection.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").one())
+
+def optimize_database():
+    """Refresh query planner statistics; cheap enough to run periodically."""
+    if engine is None:
+        return
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA optimize")
+
+@contextlib.contextmanager
+def session_scope():
+    """Transactional session scope: commits on success, rolls back on error, always closes.
+
+        with session_scope() as db:
+            db.add(obj)
+    """
     if SessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
-def utcnow():
-    return datetime.datetime.utcnow()
\ No newline at end of file
+def get_db_session():
+    if SessionLocal is None:
+        raise RuntimeError("Database not initialized. Call init_db() first.")
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,6 +1,13 @@
+import functools
 import jdatetime
 import datetime
-from typing import Union, Tuple, List
+from typing import Callable, Iterable, Optional, Union, Tuple, List
+
+_PERSIAN_DIGITS = str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹')
+_JALALI_MONTHS = (
+    "فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور",
+    "مهر", "آبان", "آذر", "دی", "بهمن", "اسفند"
+)
 
 # --- Date Conversion Utilities ---
 def gregorian_to_jalali(greg_date: Union[datetime.date, datetime.datetime]) -> jdatetime.date:
@@ -9,7 +16,12 @@ def gregorian_to_jalali(greg_date: Union[datetime.date, datetime.datetime]) -> j
         greg_date = greg_date.date()
     if not isinstance(greg_date, datetime.date):
          raise TypeError("Input must be a datetime.date or datetime.datetime object")
-    return jdatetime.date.fromgregorian(date=greg_date)
+    return _greg_to_jalali_cached(greg_date.year, greg_date.month, greg_date.day)
+
+@functools.lru_cache(maxsize=4096)
+def _greg_to_jalali_cached(year: int, month: int, day: int) -> jdatetime.date:
+    # A month view repeats the same few dozen dates across many rows
+    return jdatetime.date.fromgregorian(year=year, month=month, day=day)
 
 def jalali_to_gregorian(jalali_date: jdatetime.date) -> datetime.date:
     """Convert Jalali date to Gregorian date."""
@@ -24,15 +36,15 @@ def format_jalali_date(jalali_date: jdatetime.date, include_time: bool = False,
     Example: ۷ خرداد ۱۴۰۳
     If include_time and gregorian_dt provided: ۷ خرداد ۱۴۰۳ — ساعت ۰۹:۰۵
     """
-    # Use Persian digits and month names from jdatetime
-    day_str = str(jalali_date.day).translate(str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹'))
-    month_name = jalali_date.j_months[jalali_date.month - 1] # j_months is zero-indexed
-    year_str = str(jalali_date.year).translate(str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹'))
+    # Use Persian digits and month names
+    day_str = str(jalali_date.day).translate(_PERSIAN_DIGITS)
+    month_name = _JALALI_MONTHS[jalali_date.month - 1]
+    year_str = str(jalali_date.year).translate(_PERSIAN_DIGITS)
 
     formatted_date = f"{day_str} {month_name} {year_str}"
 
     if include_time and gregorian_dt:
-         time_str = gregorian_dt.strftime("%H:%M").translate(str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹'))
+         time_str = f"{gregorian_dt.hour:02d}:{gregorian_dt.minute:02d}".translate(_PERSIAN_DIGITS)
          formatted_date += f" — ساعت {time_str}"
 
     return formatted_date
@@ -40,13 +52,34 @@ def format_jalali_date(jalali_date: jdatetime.date, include_time: bool = False,
 def format_gregorian_date_iso(gregorian_date: Union[datetime.date, datetime.datetime]) -> str:
     """Format Gregorian date as ISO string for tooltips/hover."""
     if isinstance(gregorian_date, datetime.datetime):
-        return gregorian_date.strftime("%Y-%m-%d %H:%M:%S")
+        d = gregorian_date
+        return f"{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}:{d.second:02d}"
     elif isinstance(gregorian_date, datetime.date):
         return gregorian_date.isoformat()
     else:
          raise TypeError("Input must be a datetime.date or datetime.datetime object")
 
 # --- Combined Display Formatting ---
+# One formatter per date_format preference, so callers formatting many values
+# resolve the preference once instead of branching on it for every value.
+def _format_jalali_part(value: Union[datetime.date, datetime.datetime]) -> str:
+    has_time = isinstance(value, datetime.datetime)
+    return format_jalali_date(gregorian_to_jalali(value), include_time=has_time,
+                              gregorian_dt=value if has_time else None)
+
+def _format_both(value: Union[datetime.date, datetime.datetime]) -> str:
+    return f"{_format_jalali_part(value)} — {format_gregorian_date_iso(value)}"
+
+_DATE_FORMATTERS = {
+    'jalali': _format_jalali_part,
+    'gregorian': format_gregorian_date_iso,
+    'both': _format_both,
+}
+
+def get_date_formatter(format_preference: str) -> Callable[[Union[datetime.date, datetime.datetime]], str]:
+    """Return the single-argument formatter for a date_format preference ('both' if unknown)."""
+    return _DATE_FORMATTERS.get(format_preference, _format_both)
+
 def format_date_for_display(gregorian_date: Union[datetime.date, datetime.datetime],
                             gregorian_dt: datetime.datetime = None, # Needed for time if datetime.date passed for gregorian_date
                             format_preference: str = 'both') -> str:
@@ -54,36 +87,48 @@ def format_date_for_display(gregorian_date: Union[datetime.date, datetime.dateti
     Format date for display based on user preference.
     format_preference: 'jalali', 'gregorian', 'both'
     """
+    if not isinstance(gregorian_date, datetime.date):
+         raise TypeError("Input must be a datetime.date or datetime.datetime object")
+    # The time part is only shown for datetime input, and then it comes from
+    # gregorian_date itself, so gregorian_dt never changes the result.
     if isinstance(gregorian_date, datetime.datetime):
-        greg_date_obj = gregorian_date.date()
-        greg_dt_obj = gregorian_date
-    elif isinstance(gregorian_date, datetime.date):
-        greg_date_obj = gregorian_date
-        greg_dt_obj = gregorian_dt if gregorian_dt else datetime.datetime.combine(gregorian_date, datetime.time.min)
+        d = gregorian_date
+        return _format_date_for_display_cached(d.toordinal(), format_preference, d.hour, d.minute, d.second)
+    return _format_date_for_display_cached(gregorian_date.toordinal(), format_preference, None, None, None)
+
+@functools.lru_cache(maxsize=4096)
+def _format_date_for_display_cached(ordinal: int, format_preference: str,
+                                    hour: Optional[int], minute: Optional[int], second: Optional[int]) -> str:
+    # hour is None for plain dates, which are shown without a time
+    if hour is None:
+        gregorian_date = datetime.date.fromordinal(ordinal)
     else:
-         raise TypeError("Input must be a datetime.date or datetime.datetime object")
+        gregorian_date = datetime.datetime.combine(
+            datetime.date.fromordinal(ordinal), datetime.time(hour, minute, second)
+        )
+    return get_date_formatter(format_preference)(gregorian_date)
 
-    jalali_date_obj = gregorian_to_jalali(greg_date_obj)
-
-    if format_preference == 'jalali':
-        return format_jalali_date(jalali_date_obj, include_time=isinstance(gregorian_date, datetime.datetime), gregorian_dt=greg_dt_obj)
-    elif format_preference == 'gregorian':
-        return format_gregorian_date_iso(gregorian_date)
-    elif format_preference == 'both':
-        jalali_part = format_jalali_date(jalali_date_obj, include_time=isinstance(gregorian_date, datetime.datetime), gregorian_dt=greg_dt_obj)
-        iso_part = format_gregorian_date_iso(gregorian_date)
-        return f"{jalali_part} — {iso_part}"
-    else: # Default to both
-        jalali_part = format_jalali_date(jalali_date_obj, include_time=isinstance(gregorian_date, datetime.datetime), gregorian_dt=greg_dt_obj)
-        iso_part = format_gregorian_date_iso(gregorian_date)
-        return f"{jalali_part} — {iso_part}"
-
-def get_jalali_month_names() -> List[str]:
-    """Returns a list of Jalali month names."""
-    return [
-        "فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور",
-        "مهر", "آبان", "آذر", "دی", "بهمن", "اسفند"
-    ]
+def format_dates_bulk(dates: Iterable[Union[datetime.date, datetime.datetime]],
+                      format_preference: str = 'both') -> List[str]:
+    """
+    Format a column of dates for display in one pass, in input order.
+    Each distinct date is converted once; repeats are dictionary hits.
+    """
+    formatter = get_date_formatter(format_preference)
+    labels = {}
+    formatted = []
+    for value in dates:
+        label = labels.get(value)
+        if label is None:
+            if not isinstance(value, datetime.date):
+                raise TypeError("Input must be a datetime.date or datetime.datetime object")
+            label = labels[value] = formatter(value)
+        formatted.append(label)
+    return formatted
+
+def get_jalali_month_names() -> Tuple[str, ...]:
+    """Returns the Jalali month names (a shared, immutable tuple)."""
+    return _JALALI_MONTHS
 
 # HEROIC FIX: New function to get Jalali month range starting from day 29
 def get_jalali_month_range(gregorian_date: datetime.date) -> Tuple[datetime.date, datetime.date]:
@@ -536,16 +536,21 @@ TRANSLATIONS = {
 
 class Translator:
     def __init__(self, language="en"):
-        self.language = language
+        self.set_language(language)
 
     def set_language(self, language):
         self.language = language
+        # Resolve the catalogs once here rather than on every lookup
+        self._catalog = TRANSLATIONS.get(language, {})
+        self._fallback = TRANSLATIONS.get("en", {})
 
     def translate(self, key, **kwargs):
         # Fallback to English if a key is missing in the current language
-        translation = TRANSLATIONS.get(self.language, {}).get(key)
+        translation = self._catalog.get(key)
         if translation is None:
-            translation = TRANSLATIONS.get("en", {}).get(key, key)
+            translation = self._fallback.get(key, key)
+        if not kwargs:
+            return translation
         
         try:
             return translation.format(**kwargs)
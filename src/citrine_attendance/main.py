@@ -5,37 +5,155 @@ Handles initialization of core services, database, default user,
 and launches the PyQt6 GUI.
 """
 import sys
+import atexit
 import logging
-from PyQt6.QtCore import Qt
+import logging.handlers
+import os
+import queue
+import time
 
 # --- CORRECTED: Use absolute imports from the package root ---
-from citrine_attendance import database
-from citrine_attendance.config import config
-from citrine_attendance.database import engine, SessionLocal, User
-from citrine_attendance.services.employee_service import employee_service
-from citrine_attendance.services.user_service import user_service
-from citrine_attendance.services.attendance_service import attendance_service
-from citrine_attendance.utils.security import hash_password
-from citrine_attendance.locale import translator
+# SQLAlchemy (via database), Qt, the translator and bcrypt are imported where
+# they are first needed, so importing this module only loads the config module.
+from citrine_attendance.config import get_config
+
+logger = logging.getLogger(__name__)
 
 # --- Logging Setup ---
+class _BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that writes through a 64 KB stream buffer.
+    The stock handler flushes after every record and its rollover check seeks
+    the stream, which flushes as well; here the file size is tracked as records
+    are written and the buffer is flushed once per batch via flush().
+    """
+    BUFFER_SIZE = 65536
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=self.BUFFER_SIZE,
+                      encoding=self.encoding, errors=self.errors)
+        self._bytes_written = os.path.getsize(self.baseFilename)
+        return stream
+
+    def _encoded_size(self, text: str) -> int:
+        return len(text.encode(self.encoding or 'utf-8', self.errors or 'strict'))
+
+    def _exceeds_max_bytes(self, size: int) -> bool:
+        return self.maxBytes > 0 and self._bytes_written + size >= self.maxBytes
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        return self._exceeds_max_bytes(self._encoded_size(self.format(record) + self.terminator))
+
+    def emit(self, record):
+        # Formats and measures each line once, rather than again in shouldRollover()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            line = self.format(record) + self.terminator
+            size = self._encoded_size(line)
+            if self._exceeds_max_bytes(size):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(line)
+            self._bytes_written += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class _BatchMemoryHandler(logging.handlers.MemoryHandler):
+    """
+    MemoryHandler that also flushes its target's stream after handing over a batch.
+    Besides a full buffer or an ERROR record, a record arriving more than
+    `flush_interval` seconds after the last flush triggers one, so the log file
+    never lags far behind; flush_log_buffer() covers idle periods.
+    """
+    def __init__(self, capacity, flushLevel=logging.ERROR, target=None, flushOnClose=True,
+                 flush_interval=5.0):
+        super().__init__(capacity, flushLevel=flushLevel, target=target, flushOnClose=flushOnClose)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record):
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def flush(self):
+        super().flush()
+        if self.target:
+            self.target.flush()
+        self._last_flush = time.monotonic()
+
+
+_LOGGING_READY = False
+# The file handler's record buffer, once setup_logging() has run
+_LOG_BUFFER = None
+# How often the GUI pushes buffered records to the log file while it is idle
+LOG_FLUSH_INTERVAL_MS = 5 * 1000
+
+def flush_log_buffer():
+    """Write any buffered log records to the log file now."""
+    if _LOG_BUFFER is not None:
+        _LOG_BUFFER.flush()
+
 def setup_logging():
-    """Configure application logging to file and console."""
+    """Configure application logging to file and console. Safe to call more than once."""
+    global _LOGGING_READY, _LOG_BUFFER
+    # basicConfig() would ignore a second call anyway (or a root logger some host
+    # already configured), so skip opening the log file and starting a listener.
+    if _LOGGING_READY or logging.getLogger().hasHandlers():
+        return
     try:
-        # Ensure the logs directory exists within the user data directory
-        log_dir = config.user_data_dir / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        log_file_path = log_dir / "app.log"
+        # AppConfig creates the logs directory (ensure_directories_exist) when it is built
+        log_file_path = get_config().user_data_dir / "logs" / "app.log"
+
+        # Records are only enqueued on the calling thread; a listener thread
+        # formats them and writes the file and console output.
+        # Thread/process fields are never formatted, so don't collect them per record
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        file_handler = _BufferedRotatingFileHandler(
+            log_file_path, maxBytes=5_000_000, backupCount=3, encoding='utf-8', delay=True
+        )
+        console_handler = logging.StreamHandler(sys.stdout) # Also print to console
+        for handler in (file_handler, console_handler):
+            handler.setFormatter(formatter)
+
+        # The file is written in batches of up to 512 records; errors flush at once,
+        # and anything older than a few seconds goes out with the next record or timer tick
+        buffered_file_handler = _BatchMemoryHandler(
+            512, flushLevel=logging.ERROR, target=file_handler, flushOnClose=True
+        )
+        _LOG_BUFFER = buffered_file_handler
+
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            log_queue, buffered_file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        # atexit runs these in reverse: drain the queue first, then flush the buffer
+        atexit.register(buffered_file_handler.flush)
+        atexit.register(listener.stop)
+
+        # The queue handler only renders the message (and any traceback) into the
+        # record; the full format is applied once by the listener's handlers.
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
 
         # Configure the root logger
         logging.basicConfig(
             level=logging.INFO, # Set to DEBUG for more verbose output during development
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file_path, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout) # Also print to console
-            ]
+            handlers=[queue_handler]
         )
+        _LOGGING_READY = True
         logging.info("Logging system initialized. Log file: %s", log_file_path)
     except Exception as e:
         # If logging setup fails, print to console and exit
@@ -44,53 +162,112 @@ def setup_logging():
 
 
 # --- Default User Creation ---
-def create_default_admin():
+def create_default_admin(db_session) -> bool:
     """
-    Creates a default 'admin' user with password 'admin123' if no users exist.
-    This should only run on the very first startup.
+    Adds a default 'admin' user with password 'admin123' to db_session if no users exist.
+    This should only run on the very first startup. The caller owns the transaction,
+    so the existence check and the insert commit together. Returns True if the user was added.
     """
-    if not hasattr(database, 'engine') or database.engine is None:
-        logging.getLogger().error("Database engine is not initialized. Cannot create default admin.")
-        print("Error: Database engine is not initialized. Cannot create default admin user.")
-        return
+    from sqlalchemy import select
+    from citrine_attendance.database import User
 
-    db_session = database.SessionLocal()
-    try:
-        user_count = db_session.query(User).count()
-
-        if user_count == 0:
-            default_username = "admin"
-            default_password = "admin123"
-            logging.getLogger().warning(
-                f"No existing users found. Creating default admin user: "
-                f"Username: '{default_username}', Password: '{default_password}'. "
-                f"*** CHANGE THIS PASSWORD IMMEDIATELY AFTER FIRST LOGIN ***"
-            )
-            print("\n" + "="*60)
-            print("SECURITY ALERT: DEFAULT ADMIN USER CREATED!")
-            print(f"Username: {default_username}")
-            print(f"Password: {default_password}")
-            print("*** CHANGE THIS PASSWORD IMMEDIATELY AFTER FIRST LOGIN ***")
-            print("="*60 + "\n")
-
-            hashed_pw = hash_password(default_password)
-            admin_user = User(
-                username=default_username,
-                password_hash=hashed_pw,
-                role="admin"
-            )
-            db_session.add(admin_user)
-            db_session.commit()
-            logging.getLogger().info(f"Default admin user '{default_username}' created successfully.")
-        else:
-            logging.getLogger().info("Existing users found in the database. Skipping default admin creation.")
+    if db_session.scalar(select(User.id).limit(1)) is not None:
+        logger.info("Existing users found in the database. Skipping default admin creation.")
+        return False
+
+    default_username = "admin"
+    default_password = "admin123"
+    logger.warning(
+        f"No existing users found. Creating default admin user: "
+        f"Username: '{default_username}', Password: '{default_password}'. "
+        f"*** CHANGE THIS PASSWORD IMMEDIATELY AFTER FIRST LOGIN ***"
+    )
+    # The warning above already reaches the log; the banner is only for a console
+    if sys.stdout is not None and sys.stdout.isatty():
+        banner = "\n".join([
+            "", "="*60,
+            "SECURITY ALERT: DEFAULT ADMIN USER CREATED!",
+            f"Username: {default_username}",
+            f"Password: {default_password}",
+            "*** CHANGE THIS PASSWORD IMMEDIATELY AFTER FIRST LOGIN ***",
+            "="*60, "", "",
+        ])
+        sys.stdout.write(banner)
+        sys.stdout.flush()
+
+    from citrine_attendance.utils.security import hash_password
+    hashed_pw = hash_password(default_password)
+    admin_user = User(
+        username=default_username,
+        password_hash=hashed_pw,
+        role="admin"
+    )
+    db_session.add(admin_user)
+    return True
+
+
+# --- Periodic Database Maintenance ---
+DB_OPTIMIZE_INTERVAL_MS = 15 * 60 * 1000
 
+def _run_periodic_optimize():
+    from citrine_attendance import database
+    try:
+        database.optimize_database()
     except Exception as e:
-        logging.getLogger().error(f"Error during default admin user creation/check: {e}", exc_info=True)
-        print(f"Warning: An error occurred while checking/creating the default admin user. See logs for details.")
-    finally:
-        db_session.close()
+        logger.warning(f"Periodic PRAGMA optimize failed: {e}")
+
+
+# The QApplication created by main(); only this module constructs one
+_QAPP = None
+
+def _launch_gui(prefetched_employees):
+    """
+    Import PyQt6, create the QApplication and build the main window.
+    Exits the process if the GUI cannot be constructed.
+
+    Returns:
+        tuple: (app, window, timers); the caller keeps the window alive, runs
+        the event loop and stops the periodic timers afterwards.
+    """
+    global _QAPP
+    try:
+        from PyQt6.QtCore import Qt, QTimer
+        from PyQt6.QtWidgets import QApplication
+        from citrine_attendance.locale import translator
+        # --- CORRECTED: Use absolute import for MainWindow ---
+        from citrine_attendance.ui.main_window import MainWindow
+
+        if _QAPP is None:
+            _QAPP = QApplication(sys.argv)
+            logger.debug("Created new QApplication instance.")
+        app = _QAPP
+
+        language = get_config().settings.get("language", "en")
+        translator.set_language(language)
+        layout_directions = {"fa": Qt.LayoutDirection.RightToLeft}
+        app.setLayoutDirection(layout_directions.get(language, Qt.LayoutDirection.LeftToRight))
 
+        # The MainWindow constructor handles the entire application flow
+        window = MainWindow(prefetched_employees=prefetched_employees)
+
+        # Keep planner statistics fresh during long sessions
+        optimize_timer = QTimer(app)
+        optimize_timer.timeout.connect(_run_periodic_optimize)
+        optimize_timer.start(DB_OPTIMIZE_INTERVAL_MS)
+
+        # Buffered log records reach the file even when nothing else is being logged
+        log_flush_timer = QTimer(app)
+        log_flush_timer.timeout.connect(flush_log_buffer)
+        log_flush_timer.start(LOG_FLUSH_INTERVAL_MS)
+    except ImportError as e:
+        logger.critical(f"Failed to import PyQt6 modules: {e}", exc_info=True)
+        print(f"Critical Error: Required GUI libraries (PyQt6) are missing or not installed correctly.")
+        sys.exit(1)
+    except Exception as e:
+        logger.critical(f"An unexpected error occurred during GUI initialization: {e}", exc_info=True)
+        print(f"Critical Error: Failed to start the application GUI. See logs for details.")
+        sys.exit(1)
+    return app, window, (optimize_timer, log_flush_timer)
 
 # --- Main Application Entry Point ---
 def main():
@@ -101,10 +278,10 @@ def main():
 
     # 1. Setup logging
     setup_logging()
-    logger = logging.getLogger(__name__)
     logger.info("Starting Zarsaham Attendance application.")
 
     # 2. Initialize the database
+    from citrine_attendance import database
     try:
         database.init_db()
         logger.info("Database initialized successfully.")
@@ -113,47 +290,44 @@ def main():
         print(f"Critical Error: Could not initialize the database. See logs for details.")
         sys.exit(1)
 
-    # 3. Create the default admin user if needed
+    # 3. Create the default admin user if needed, in one session and transaction
     try:
-        create_default_admin()
+        with database.SessionLocal.begin() as db_session:
+            created = create_default_admin(db_session)
+        if created:
+            logger.info("Default admin user created successfully.")
     except Exception as e:
         logger.error(f"Error ensuring default admin user exists: {e}", exc_info=True)
         print(f"Warning: Could not check or create the default admin user. See logs for details.")
 
-    # 4. Launch the PyQt6 GUI
-    logger.info("Initializing PyQt6 GUI...")
-    try:
-        from PyQt6.QtWidgets import QApplication
-        # --- CORRECTED: Use absolute import for MainWindow ---
-        from citrine_attendance.ui.main_window import MainWindow
+    # 4. Fetch the employee list for the first dashboard paint on a worker
+    # thread, overlapping the query with the PyQt6 imports and window setup below
+    from concurrent.futures import ThreadPoolExecutor
+    from citrine_attendance.services.employee_service import employee_service
+    prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    prefetched_employees = prefetch_executor.submit(employee_service.get_all_employees)
+    prefetch_executor.shutdown(wait=False)
 
-        app = QApplication.instance()
-        if app is None:
-            app = QApplication(sys.argv)
-            logger.debug("Created new QApplication instance.")
-
-        translator.set_language(config.settings.get("language", "en"))
-        if config.settings.get("language") == "fa":
-            app.setLayoutDirection(Qt.LayoutDirection.RightToLeft)
-        else:
-            app.setLayoutDirection(Qt.LayoutDirection.LeftToRight)
-        
-        # The MainWindow constructor handles the entire application flow
-        window = MainWindow() 
+    # 5. Launch the PyQt6 GUI
+    logger.info("Initializing PyQt6 GUI...")
+    app, window, timers = _launch_gui(prefetched_employees)
 
-        logger.info("Main application window initialization started. Starting GUI event loop.")
+    logger.info("Main application window initialization started. Starting GUI event loop.")
+    try:
         exit_code = app.exec()
-        logger.info(f"GUI event loop finished with exit code: {exit_code}")
-        sys.exit(exit_code)
-
-    except ImportError as e:
-        logger.critical(f"Failed to import PyQt6 modules: {e}", exc_info=True)
-        print(f"Critical Error: Required GUI libraries (PyQt6) are missing or not installed correctly.")
-        sys.exit(1)
     except Exception as e:
-        logger.critical(f"An unexpected error occurred during GUI initialization or execution: {e}", exc_info=True)
-        print(f"Critical Error: Failed to start or run the application GUI. See logs for details.")
+        logger.critical(f"An unexpected error occurred while running the GUI: {e}", exc_info=True)
+        print(f"Critical Error: The application GUI stopped unexpectedly. See logs for details.")
         sys.exit(1)
+    logger.info(f"GUI event loop finished with exit code: {exit_code}")
+
+    for timer in timers:
+        timer.stop()
+    try:
+        database.checkpoint_wal()
+    except Exception as e:
+        logger.warning(f"Could not checkpoint the database on exit: {e}")
+    sys.exit(exit_code)
 
 # This check is now mainly for direct testing of this file,
 # but the application should be started via run.py
@@ -2,9 +2,11 @@
 
 import logging
 import re
-from typing import List, Optional, Dict
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session, joinedload, aliased
-from sqlalchemy import and_, func
+from sqlalchemy import event, func, insert, lambda_stmt, select, update
 import datetime
 
 from ..database import Attendance, Employee, get_db_session
@@ -15,6 +17,48 @@ from ..locale import _
 
 logger = logging.getLogger(__name__)
 
+_DIGIT_TRANS = str.maketrans({
+    '۰':'0','۱':'1','۲':'2','۳':'3','۴':'4','۵':'5','۶':'6','۷':'7','۸':'8','۹':'9',
+    '٠':'0','١':'1','٢':'2','٣':'3','٤':'4','٥':'5','٦':'6','٧':'7','٨':'8','٩':'9'
+})
+
+def _norm_digits(s: str) -> str:
+    if s is None: return ""
+    return str(s).strip().translate(_DIGIT_TRANS)
+
+def _to_time(obj):
+    """A datetime.time from a time or an "HH:MM" string (Persian/Arabic digits allowed), else None."""
+    if obj is None: return None
+    if isinstance(obj, datetime.time): return obj
+    s = _norm_digits(obj)
+    if not s: return None
+    try:
+        parts = re.findall(r'\d+', s)
+        if len(parts) >= 2:
+            h, m = int(parts[0]), int(parts[1])
+            if 0 <= h <= 23 and 0 <= m <= 59:
+                return datetime.time(h, m)
+        raise ValueError(f"Bad time format: {s}")
+    except Exception as e:
+        logger.warning(f"Failed to parse time value '{obj}': {e}")
+        return None
+
+
+_DAY_SECONDS = 24 * 60 * 60
+
+def _seconds_of_day(t: datetime.time) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+def _interval_secs(t_start: datetime.time, t_end: datetime.time):
+    """(start, end) in seconds since midnight; an end at or before the start is on the next day."""
+    start, end = _seconds_of_day(t_start), _seconds_of_day(t_end)
+    if end <= start: end += _DAY_SECONDS
+    return start, end
+
+def _overlap_minutes(a_start: int, a_end: int, b_start: int, b_end: int) -> int:
+    return max(0, (min(a_end, b_end) - max(a_start, b_start)) // 60)
+
+
 class AttendanceServiceError(Exception): pass
 class AttendanceNotFoundError(AttendanceServiceError): pass
 class AttendanceAlreadyExistsError(AttendanceServiceError): pass
@@ -30,9 +74,47 @@ class AttendanceService:
     STATUS_PARTIAL = "partial"
     STATUS_DISPLAY = {"present": "Present", "absent": "Absent", "on_leave": "On Leave", "partial": "Partial"}
 
+    # Seconds a get_daily_summary() result is reused; attendance writes and employee
+    # inserts/deletes invalidate it earlier
+    DAILY_SUMMARY_TTL = 30.0
+
+    def __init__(self):
+        self._daily_summary_cache: Dict[datetime.date, tuple] = {}
+        self.invalidate_config_cache()
+
+    def invalidate_config_cache(self):
+        """Re-read the work-time settings used by _calculate_all_fields; runs whenever config saves or reloads them."""
+        settings = config.settings
+        self._workday_minutes = int(settings.get("workday_hours", 8)) * 60
+        launch_start = _to_time(settings.get("default_launch_start_time", "14:00"))
+        launch_end = _to_time(settings.get("default_launch_end_time", "15:30"))
+        late_threshold = _to_time(settings.get("late_threshold_time", "10:00"))
+        # None when a setting cannot be parsed; _calculate_all_fields then leaves the fields reset
+        self._launch_interval = _interval_secs(launch_start, launch_end) if launch_start and launch_end else None
+        self._late_threshold_secs = _seconds_of_day(late_threshold) if late_threshold else None
+
     def _get_session(self) -> Session:
         return next(get_db_session())
 
+    def invalidate_daily_summary(self, date: Optional[datetime.date] = None):
+        """Drop the cached summary for a date, or for every date when none is given."""
+        if date is None:
+            self._daily_summary_cache.clear()
+        else:
+            self._daily_summary_cache.pop(date, None)
+
+    @contextmanager
+    def _session(self, db: Optional[Session] = None):
+        """Use the caller's session, or open one and close it afterwards. Rolls back on error."""
+        session = db or self._get_session()
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            if db is None: session.close()
+
     def get_monthly_leave_taken(self, employee_id: int, date: datetime.date, db: Session) -> int:
         """Calculates the total leave minutes taken by an employee in a specific Jalali month."""
         start_of_month, end_of_month = get_jalali_month_range(date)
@@ -53,31 +135,6 @@ class AttendanceService:
          - excludes leave-overlap when calculating tardiness (so leave at late threshold cancels tardiness)
          - computes main_work_minutes as workday - tardiness - early_departure (if any) to match expected semantics
         """
-        def _norm_digits(s: str) -> str:
-            if s is None: return ""
-            s = str(s).strip()
-            trans = str.maketrans({
-                '۰':'0','۱':'1','۲':'2','۳':'3','۴':'4','۵':'5','۶':'6','۷':'7','۸':'8','۹':'9',
-                '٠':'0','١':'1','٢':'2','٣':'3','٤':'4','٥':'5','٦':'6','٧':'7','٨':'8','٩':'9'
-            })
-            return s.translate(trans)
-
-        def _to_time(obj):
-            if obj is None: return None
-            if isinstance(obj, datetime.time): return obj
-            s = _norm_digits(obj)
-            if not s: return None
-            try:
-                parts = re.findall(r'\d+', s)
-                if len(parts) >= 2:
-                    h, m = int(parts[0]), int(parts[1])
-                    if 0 <= h <= 23 and 0 <= m <= 59:
-                        return datetime.time(h, m)
-                raise ValueError(f"Bad time format: {s}")
-            except Exception as e:
-                logger.warning(f"Failed to parse time value '{obj}': {e}")
-                return None
-
         # Reset fields
         record.duration_minutes = 0
         record.launch_duration_minutes = 0
@@ -95,38 +152,24 @@ class AttendanceService:
         leave_start = _to_time(record.leave_start)
         leave_end = _to_time(record.leave_end)
         
-        workday_minutes = int(config.settings.get("workday_duration", 8)) * 60
-        launch_start_time = _to_time(config.settings.get("default_launch_start_time", "14:00"))
-        launch_end_time = _to_time(config.settings.get("default_launch_end_time", "15:30"))
-        late_threshold_time = _to_time(config.settings.get("late_threshold", "10:00"))
-
-        if not all([launch_start_time, launch_end_time, late_threshold_time]):
+        workday_minutes = self._workday_minutes
+        if self._launch_interval is None or self._late_threshold_secs is None:
             logger.error("Could not parse critical time settings from config.")
             return
 
-        def _normalize_interval(date_obj, t_start, t_end):
-            s_dt = datetime.datetime.combine(date_obj, t_start)
-            e_dt = datetime.datetime.combine(date_obj, t_end)
-            if e_dt <= s_dt: e_dt += datetime.timedelta(days=1)
-            return s_dt, e_dt
-
-        def _overlap_minutes(a_start, a_end, b_start, b_end):
-            start = max(a_start, b_start)
-            end = min(a_end, b_end)
-            return max(0, int((end - start).total_seconds() / 60))
-
-        # Prepare launch interval (used both for launch deductions and later calculations)
-        launch_s_dt, launch_e_dt = _normalize_interval(record.date, launch_start_time, launch_end_time)
-        total_launch_duration = int((launch_e_dt - launch_s_dt).total_seconds() / 60)
+        # All times below are seconds since midnight of record.date; an interval whose
+        # end is not after its start ends on the next day.
+        launch_start, launch_end = self._launch_interval
+        total_launch_duration = (launch_end - launch_start) // 60
 
         # Calculate leave duration (if provided) and deduct any lunch overlap from leave
-        ls_dt = le_dt = None
+        leave_s = leave_e = None
         if leave_start and leave_end:
-            ls_dt, le_dt = _normalize_interval(record.date, leave_start, leave_end)
-            raw_leave_minutes = max(0, int((le_dt - ls_dt).total_seconds() / 60))
+            leave_s, leave_e = _interval_secs(leave_start, leave_end)
+            raw_leave_minutes = (leave_e - leave_s) // 60
 
             # Deduct lunch overlap from leave (per requirements)
-            overlap_leave_launch = _overlap_minutes(ls_dt, le_dt, launch_s_dt, launch_e_dt)
+            overlap_leave_launch = _overlap_minutes(leave_s, leave_e, launch_start, launch_end)
             record.leave_duration_minutes = max(0, raw_leave_minutes - overlap_leave_launch)
         else:
             record.leave_duration_minutes = 0
@@ -137,82 +180,71 @@ class AttendanceService:
                 record.status = self.STATUS_ON_LEAVE
             return
 
-        dt_in = datetime.datetime.combine(record.date, time_in)
-        late_threshold_dt = datetime.datetime.combine(record.date, late_threshold_time)
+        secs_in = _seconds_of_day(time_in)
+        late_threshold = self._late_threshold_secs
 
         # Compute tardiness but subtract any leave overlap that covers part/all of the tardiness window.
-        if dt_in <= late_threshold_dt:
+        if secs_in <= late_threshold:
             record.tardiness_minutes = 0
         else:
-            raw_tardiness = int((dt_in - late_threshold_dt).total_seconds() / 60)
+            raw_tardiness = (secs_in - late_threshold) // 60
             # compute overlap between leave interval and tardiness interval
             overlap_leave_tardiness = 0
-            if ls_dt and le_dt:
-                overlap_leave_tardiness = _overlap_minutes(ls_dt, le_dt, late_threshold_dt, dt_in)
+            if leave_s is not None:
+                overlap_leave_tardiness = _overlap_minutes(leave_s, leave_e, late_threshold, secs_in)
             record.tardiness_minutes = max(0, raw_tardiness - overlap_leave_tardiness)
 
         if not time_out:
             record.status = self.STATUS_PARTIAL
             return
 
-        dt_out = datetime.datetime.combine(record.date, time_out)
-        if dt_out <= dt_in: dt_out += datetime.timedelta(days=1)
+        secs_out = _seconds_of_day(time_out)
+        if secs_out <= secs_in: secs_out += _DAY_SECONDS
 
         # Calculate primary duration (time_in to time_out)
-        primary_duration = int((dt_out - dt_in).total_seconds() / 60)
+        primary_duration = (secs_out - secs_in) // 60
         
-        # Calculate secondary duration (time_in_2 to time_out_2) if both are present
+        # Secondary presence interval (time_in_2 to time_out_2) if both are present
+        secs_in_2 = secs_out_2 = None
         secondary_duration = 0
         if time_in_2 and time_out_2:
-            dt_in_2 = datetime.datetime.combine(record.date, time_in_2)
-            dt_out_2 = datetime.datetime.combine(record.date, time_out_2)
-            # Handle case where time_out_2 is on the next day
-            if dt_out_2 <= dt_in_2: dt_out_2 += datetime.timedelta(days=1)
-            secondary_duration = int((dt_out_2 - dt_in_2).total_seconds() / 60)
+            secs_in_2, secs_out_2 = _interval_secs(time_in_2, time_out_2)
+            secondary_duration = (secs_out_2 - secs_in_2) // 60
         
         # Total duration is the sum of primary and secondary durations
         record.duration_minutes = primary_duration + secondary_duration
 
         # Recompute launch_duration_minutes as overlap between presence interval and launch interval.
         # This includes both primary (time_in to time_out) and secondary (time_in_2 to time_out_2) periods
-        launch_overlap_primary = _overlap_minutes(dt_in, dt_out, launch_s_dt, launch_e_dt)
+        launch_overlap_primary = _overlap_minutes(secs_in, secs_out, launch_start, launch_end)
         launch_overlap_secondary = 0
-        if time_in_2 and time_out_2:
-            dt_in_2 = datetime.datetime.combine(record.date, time_in_2)
-            dt_out_2 = datetime.datetime.combine(record.date, time_out_2)
-            if dt_out_2 <= dt_in_2: dt_out_2 += datetime.timedelta(days=1)
-            launch_overlap_secondary = _overlap_minutes(dt_in_2, dt_out_2, launch_s_dt, launch_e_dt)
+        if secs_in_2 is not None:
+            launch_overlap_secondary = _overlap_minutes(secs_in_2, secs_out_2, launch_start, launch_end)
         record.launch_duration_minutes = launch_overlap_primary + launch_overlap_secondary
 
         # HEROIC FIX: Implemented new overtime and early departure logic
         # HEROIC ENHANCEMENT: Consider time_out_2 when determining the actual end time
-        try:
-            # end_of_work_dt is defined as late_threshold + workday minutes + lunch duration
-            end_of_work_dt = late_threshold_dt + datetime.timedelta(minutes=(workday_minutes + total_launch_duration))
-
-            # Determine the actual last time out (considering both time_out and time_out_2)
-            actual_end_dt = dt_out
-            if time_out_2:
-                dt_out_2 = datetime.datetime.combine(record.date, time_out_2)
-                if dt_out_2 <= dt_in: dt_out_2 += datetime.timedelta(days=1)
-                # Use the later of the two time_out values
-                actual_end_dt = max(dt_out, dt_out_2)
-
-            if actual_end_dt > end_of_work_dt:
-                record.overtime_minutes = int((actual_end_dt - end_of_work_dt).total_seconds() / 60)
-                record.early_departure_minutes = 0
-            elif actual_end_dt < end_of_work_dt:
-                record.early_departure_minutes = int((end_of_work_dt - actual_end_dt).total_seconds() / 60)
-                record.overtime_minutes = 0
-            else:
-                record.overtime_minutes = 0
-                record.early_departure_minutes = 0
-
-        except Exception as e:
-            logger.warning(f"Overtime/Early Departure calculation failed, falling back to old method: {e}")
-            net_work_minutes_fallback = record.duration_minutes - record.launch_duration_minutes - record.leave_duration_minutes
-            record.overtime_minutes = max(0, net_work_minutes_fallback - workday_minutes)
-            record.early_departure_minutes = 0 # No fallback for early departure
+        # end of work is defined as late_threshold + workday minutes + lunch duration
+        end_of_work = late_threshold + (workday_minutes + total_launch_duration) * 60
+
+        # Determine the actual last time out (considering both time_out and time_out_2)
+        actual_end = secs_out
+        if time_out_2:
+            # Rolled over relative to time_in, not time_in_2, so it can differ from secs_out_2 above
+            last_out_2 = _seconds_of_day(time_out_2)
+            if last_out_2 <= secs_in: last_out_2 += _DAY_SECONDS
+            # Use the later of the two time_out values
+            actual_end = max(secs_out, last_out_2)
+
+        if actual_end > end_of_work:
+            record.overtime_minutes = (actual_end - end_of_work) // 60
+            record.early_departure_minutes = 0
+        elif actual_end < end_of_work:
+            record.early_departure_minutes = (end_of_work - actual_end) // 60
+            record.overtime_minutes = 0
+        else:
+            record.overtime_minutes = 0
+            record.early_departure_minutes = 0
 
         # MAIN-WORK: user-desired semantics: allocated workday minus tardiness and minus early-departure (if any).
         # This matches expectations where main_work = workday - tardiness (and reduced further by early departure).
@@ -240,10 +272,10 @@ class AttendanceService:
             )
 
     def add_manual_attendance(self, db: Optional[Session] = None, **kwargs) -> Attendance:
-        managed = db is None
-        session = db or self._get_session()
-        try:
-            if session.query(Attendance).filter_by(employee_id=kwargs['employee_id'], date=kwargs['date']).first():
+        with self._session(db) as session:
+            # Existence check only: SELECT EXISTS(...) stops at the first idx_attendance_employee_date entry
+            duplicate = session.query(Attendance.id).filter_by(employee_id=kwargs['employee_id'], date=kwargs['date']).exists()
+            if session.query(duplicate).scalar():
                 raise AttendanceAlreadyExistsError(_("record_already_exists_for_date", date=kwargs['date']))
             
             new_record = Attendance(**kwargs)
@@ -254,19 +286,91 @@ class AttendanceService:
 
             session.add(new_record)
             session.commit()
-            session.refresh(new_record)
+            self.invalidate_daily_summary(new_record.date)
             return new_record
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            if managed: session.close()
+
+    # Columns written by _calculate_all_fields
+    _DERIVED_FIELDS = (
+        "duration_minutes", "launch_duration_minutes", "leave_duration_minutes",
+        "tardiness_minutes", "early_departure_minutes", "main_work_minutes",
+        "overtime_minutes", "status",
+    )
+    BULK_INSERT_BATCH_SIZE = 1000
+    EXPORT_BATCH_SIZE = 1000
+    UPDATE_CHUNK_SIZE = 500
+    # Export column labels (translation keys), in the order get_attendance_for_export fills them
+    EXPORT_COLUMNS = (
+        "Employee Name", "Date", "Time In", "Time Out", "Time In 2", "Time Out 2",
+        "Leave (min)", "Used Leave This Month (min)", "Remaining Leave This Month (min)",
+        "Tardiness (min)", "Early Departure (min)", "Main Work (min)", "Overtime (min)",
+        "Launch Time (min)", "Total Duration (min)", "Status", "Note",
+    )
+
+    def bulk_create_attendance(self, records: List[Dict], db: Optional[Session] = None) -> int:
+        """
+        Insert many attendance rows in one transaction using executemany-style
+        Core inserts instead of per-row session.add(). Derived fields are
+        calculated as for manual entries; timestamps come from the column
+        defaults (CURRENT_TIMESTAMP). Intended for imports: duplicate and
+        leave-balance checks are left to the caller. Returns the number of rows inserted.
+        """
+        if not records:
+            return 0
+        with self._session(db) as session:
+            rows = []
+            for data in records:
+                record = Attendance(**data)
+                self._calculate_all_fields(record)
+                row = dict(data)
+                for field in self._DERIVED_FIELDS:
+                    row[field] = getattr(record, field)
+                row.setdefault("is_archived", False)
+                rows.append(row)
+
+            # executemany needs the same keys in every row; absent optional values become NULL
+            columns = set().union(*rows)
+            for row in rows:
+                for column in columns.difference(row):
+                    row[column] = None
+
+            for start in range(0, len(rows), self.BULK_INSERT_BATCH_SIZE):
+                session.execute(insert(Attendance), rows[start:start + self.BULK_INSERT_BATCH_SIZE])
+            session.commit()
+            self.invalidate_daily_summary()
+            logger.info(f"Bulk inserted {len(rows)} attendance records.")
+            return len(rows)
+
+    def add_manual_attendance_many(self, records: List[Dict], db: Optional[Session] = None) -> int:
+        """
+        Bulk counterpart of add_manual_attendance for imports: rows whose (employee_id, date)
+        already exists, in the database or earlier in `records`, are skipped instead of
+        raising, and the rest go through bulk_create_attendance. Leave balances are not
+        validated. Returns the number of rows inserted.
+        """
+        if not records:
+            return 0
+        with self._session(db) as session:
+            # One query for the existing keys over the span of the import
+            dates = [r['date'] for r in records]
+            existing = set(
+                session.query(Attendance.employee_id, Attendance.date)
+                .filter(Attendance.employee_id.in_({r['employee_id'] for r in records}),
+                        Attendance.date.between(min(dates), max(dates)))
+                .all()
+            )
+            new_records = []
+            for data in records:
+                key = (data['employee_id'], data['date'])
+                if key not in existing:
+                    existing.add(key)
+                    new_records.append(data)
+            if len(new_records) < len(records):
+                logger.info(f"Skipping {len(records) - len(new_records)} attendance rows that already exist.")
+            return self.bulk_create_attendance(new_records, db=session)
 
     def update_attendance(self, attendance_id: int, db: Optional[Session] = None, **kwargs) -> Attendance:
-        managed = db is None
-        session = db or self._get_session()
-        try:
-            record = session.query(Attendance).filter_by(id=attendance_id).options(joinedload(Attendance.employee)).first()
+        with self._session(db) as session:
+            record = session.get(Attendance, attendance_id, options=[joinedload(Attendance.employee)])
             if not record: raise AttendanceNotFoundError("Record not found.")
 
             for key, value in kwargs.items():
@@ -278,34 +382,30 @@ class AttendanceService:
                  self._validate_leave_balance(record.employee_id, record.date, record.leave_duration_minutes, session, old_record_id=attendance_id)
 
             session.commit()
-            session.refresh(record)
+            # The date itself may have been edited, so drop every cached day
+            self.invalidate_daily_summary()
             return record
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            if managed: session.close()
 
     def delete_attendance(self, attendance_id: int, db: Optional[Session] = None):
-        managed = db is None
-        session = db or self._get_session()
-        try:
-            record = session.query(Attendance).filter_by(id=attendance_id).first()
+        with self._session(db) as session:
+            record = session.get(Attendance, attendance_id)
             if not record: raise AttendanceNotFoundError("Record not found.")
             session.delete(record)
             session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            if managed: session.close()
+            self.invalidate_daily_summary(record.date)
 
-    def get_attendance_records(self, db: Optional[Session] = None, **filters) -> List[Attendance]:
-        managed = db is None
-        session = db or self._get_session()
-        try:
+    def get_attendance_records(self, db: Optional[Session] = None, raw: bool = False, **filters) -> List[Attendance]:
+        """
+        Attendance records matching the filters, newest first. With raw=True the stored
+        records come back as read-only Row objects (same attribute names, no ORM identity
+        map or instrumentation) for display-only callers; absent-day placeholders are
+        always unsaved Attendance objects.
+        """
+        with self._session(db) as session:
             employee_alias = aliased(Employee)
             query = session.query(Attendance).outerjoin(employee_alias, Attendance.employee)
+            if raw:
+                query = query.with_entities(*Attendance.__table__.columns)
             
             employee_id = filters.get('employee_id')
             start_date = filters.get('start_date')
@@ -342,13 +442,9 @@ class AttendanceService:
                 # Filter out holiday dates configured in app settings
                 results = [r for r in results if not is_holiday(r.date)]
                 return results
-        finally:
-            if managed: session.close()
 
     def get_archived_attendance_records(self, db: Optional[Session] = None, **filters) -> List[Attendance]:
-        managed = db is None
-        session = db or self._get_session()
-        try:
+        with self._session(db) as session:
             employee_alias = aliased(Employee)
             query = session.query(Attendance).join(employee_alias, Attendance.employee)
             if filters.get('employee_id'): query = query.filter(Attendance.employee_id == filters['employee_id'])
@@ -357,82 +453,121 @@ class AttendanceService:
             if filters.get('statuses'): query = query.filter(Attendance.status.in_(filters['statuses']))
             query = query.filter(Attendance.is_archived == True)
             return query.order_by(Attendance.date.desc(), employee_alias.last_name).all()
-        finally:
-            if managed: session.close()
 
     def unarchive_records(self, record_ids: List[int], db: Optional[Session] = None) -> int:
-        managed = db is None
-        session = db or self._get_session()
-        try:
-            updated_count = session.query(Attendance).filter(Attendance.id.in_(record_ids)).update({"is_archived": False})
+        with self._session(db) as session:
+            # Chunked so the IN list stays under SQLite's bound-parameter limit and every
+            # full chunk reuses the same compiled statement
+            updated_count = 0
+            for i in range(0, len(record_ids), self.UPDATE_CHUNK_SIZE):
+                result = session.execute(
+                    update(Attendance)
+                    .where(Attendance.id.in_(record_ids[i:i + self.UPDATE_CHUNK_SIZE]), Attendance.is_archived == True)
+                    .values(is_archived=False)
+                )
+                updated_count += result.rowcount
             session.commit()
             return updated_count
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            if managed: session.close()
     
     def get_attendance_for_export(self, db: Optional[Session] = None, **filters) -> List[Dict]:
-        managed = db is None
-        session = db or self._get_session()
-        try:
-            query = session.query(Attendance).options(joinedload(Attendance.employee))
+        """Export rows as a list, for callers that preview, re-read or count them."""
+        return list(self.iter_attendance_for_export(db=db, **filters))
+
+    def iter_attendance_for_export(self, db: Optional[Session] = None, **filters) -> Iterator[Dict]:
+        """
+        Yield one export row (translated column label -> value) per matching record,
+        newest first, reading the records in batches of EXPORT_BATCH_SIZE.
+        """
+        with self._session(db) as session:
+            query = session.query(Attendance)
             if filters.get('employee_id'): query = query.filter(Attendance.employee_id == filters['employee_id'])
             if filters.get('start_date'): query = query.filter(Attendance.date >= filters['start_date'])
             if filters.get('end_date'): query = query.filter(Attendance.date <= filters['end_date'])
-            records = query.order_by(Attendance.date.desc()).all()
 
-            if not records: return []
+            # Leave periods per distinct date (HEROIC FIX: not named '_' to keep the translator)
+            periods = {d: get_jalali_month_range(d) for (d,) in query.with_entities(Attendance.date).distinct()}
+            if not periods: return
 
+            # Leave used per (employee, period), from one query over every period the
+            # export touches instead of one SUM query per employee and period. Rows are
+            # matched against the period ranges, as get_monthly_leave_taken does: a date
+            # need not fall inside the range computed for it.
             monthly_leave_cache = {}
-            unique_emp_dates = {(r.employee_id, r.date) for r in records}
-            for emp_id, date_val in unique_emp_dates:
-                # HEROIC FIX: Use a different variable name to avoid overwriting the '_' function
-                start_of_period, _end_of_period = get_jalali_month_range(date_val)
-                cache_key = (emp_id, start_of_period)
-                if cache_key not in monthly_leave_cache:
-                    monthly_leave_cache[cache_key] = self.get_monthly_leave_taken(emp_id, date_val, session)
-
-            export_data = []
+            period_ranges = sorted(set(periods.values()))
+            leave_query = session.query(
+                Attendance.employee_id, Attendance.date, Attendance.leave_duration_minutes
+            ).filter(
+                Attendance.date.between(min(p[0] for p in periods.values()), max(p[1] for p in periods.values())),
+                Attendance.leave_duration_minutes.isnot(None),
+            )
+            if filters.get('employee_id'): leave_query = leave_query.filter(Attendance.employee_id == filters['employee_id'])
+            for emp_id, date_val, minutes in leave_query:
+                for start_of_period, end_of_period in period_ranges:
+                    if start_of_period > date_val: break
+                    if date_val <= end_of_period:
+                        cache_key = (emp_id, start_of_period)
+                        monthly_leave_cache[cache_key] = monthly_leave_cache.get(cache_key, 0) + minutes
+
+            # Only the exported columns, joined with the employee's name and allowance: plain
+            # rows, no Attendance/Employee instances, fetched in batches as they are yielded
+            records = (query.join(Attendance.employee)
+                       .with_entities(
+                           Attendance.employee_id, Attendance.date,
+                           Attendance.time_in, Attendance.time_out, Attendance.time_in_2, Attendance.time_out_2,
+                           Attendance.leave_duration_minutes, Attendance.tardiness_minutes,
+                           Attendance.early_departure_minutes, Attendance.main_work_minutes,
+                           Attendance.overtime_minutes, Attendance.launch_duration_minutes,
+                           Attendance.duration_minutes, Attendance.status, Attendance.note,
+                           Employee.first_name, Employee.last_name, Employee.monthly_leave_allowance_minutes,
+                       )
+                       .order_by(Attendance.date.desc())
+                       .yield_per(self.EXPORT_BATCH_SIZE))
+
+            # Loop-invariant lookups hoisted: the translated column labels, the status
+            # labels and each employee's display name are resolved once, not per row
+            labels = [_(column) for column in self.EXPORT_COLUMNS]
+            status_map = self.STATUS_DISPLAY
+            names = {}
             for r in records:
-                allowance = r.employee.monthly_leave_allowance_minutes if r.employee else 0
-                # HEROIC FIX: Use a different variable name here as well
-                start_of_period, _end_of_period = get_jalali_month_range(r.date)
-                used_leave = monthly_leave_cache.get((r.employee_id, start_of_period), 0)
-                
+                allowance = r.monthly_leave_allowance_minutes
+                used_leave = monthly_leave_cache.get((r.employee_id, periods[r.date][0]), 0)
+                name = names.get(r.employee_id)
+                if name is None:
+                    name = names[r.employee_id] = f"{r.first_name or ''} {r.last_name or ''}".strip()
+
                 # HEROIC IMPLEMENTATION: Include time_in_2 and time_out_2 in export
-                export_data.append({
-                    _("Employee Name"): f"{r.employee.first_name or ''} {r.employee.last_name or ''}".strip(),
-                    _("Date"): r.date.isoformat(), 
-                    _("Time In"): r.time_in.strftime("%H:%M") if r.time_in else "",
-                    _("Time Out"): r.time_out.strftime("%H:%M") if r.time_out else "",
-                    _("Time In 2"): r.time_in_2.strftime("%H:%M") if r.time_in_2 else "",
-                    _("Time Out 2"): r.time_out_2.strftime("%H:%M") if r.time_out_2 else "",
-                    _("Leave (min)"): r.leave_duration_minutes or 0,
-                    _("Used Leave This Month (min)"): used_leave,
-                    _("Remaining Leave This Month (min)"): max(0, (allowance or 0) - used_leave),
-                    _("Tardiness (min)"): r.tardiness_minutes or 0,
-                    _("Early Departure (min)"): r.early_departure_minutes or 0, # HEROIC
-                    _("Main Work (min)"): r.main_work_minutes or 0,
-                    _("Overtime (min)"): r.overtime_minutes or 0, 
-                    _("Launch Time (min)"): r.launch_duration_minutes or 0,
-                    _("Total Duration (min)"): r.duration_minutes or 0,
-                    _("Status"): self.STATUS_DISPLAY.get(r.status, r.status),
-                    _("Note"): r.note or "",
-                })
-            return export_data
-        finally:
-            if managed: session.close()
+                yield dict(zip(labels, (
+                    name,
+                    r.date.isoformat(),
+                    r.time_in.strftime("%H:%M") if r.time_in else "",
+                    r.time_out.strftime("%H:%M") if r.time_out else "",
+                    r.time_in_2.strftime("%H:%M") if r.time_in_2 else "",
+                    r.time_out_2.strftime("%H:%M") if r.time_out_2 else "",
+                    r.leave_duration_minutes or 0,
+                    used_leave,
+                    max(0, (allowance or 0) - used_leave),
+                    r.tardiness_minutes or 0,
+                    r.early_departure_minutes or 0, # HEROIC
+                    r.main_work_minutes or 0,
+                    r.overtime_minutes or 0,
+                    r.launch_duration_minutes or 0,
+                    r.duration_minutes or 0,
+                    status_map.get(r.status, r.status),
+                    r.note or "",
+                )))
+
+    def _get_day_record(self, session: Session, employee_id: int, date: datetime.date) -> Optional[Attendance]:
+        """The employee's record for a date. A lambda statement, so clock in/out reuse the
+        cached compiled SELECT without rebuilding its cache key on every call."""
+        stmt = lambda_stmt(lambda: select(Attendance).where(Attendance.employee_id == employee_id, Attendance.date == date))
+        return session.execute(stmt).scalars().first()
 
     def clock_in(self, employee_id: int, db: Optional[Session] = None) -> Attendance:
-        managed = db is None
-        session = db or self._get_session()
-        try:
+        with self._session(db) as session:
             today = datetime.date.today()
             now = datetime.datetime.now().time().replace(second=0, microsecond=0)
             
-            record = session.query(Attendance).filter_by(employee_id=employee_id, date=today).first()
+            record = self._get_day_record(session, employee_id, today)
             
             if record and record.time_in and not record.time_out:
                 raise AlreadyClockedInError("Employee is already clocked in today.")
@@ -445,22 +580,15 @@ class AttendanceService:
             
             self._calculate_all_fields(record)
             session.commit()
-            session.refresh(record)
+            self.invalidate_daily_summary(today)
             return record
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            if managed: session.close()
 
     def clock_out(self, employee_id: int, db: Optional[Session] = None) -> Attendance:
-        managed = db is None
-        session = db or self._get_session()
-        try:
+        with self._session(db) as session:
             today = datetime.date.today()
             now = datetime.datetime.now().time().replace(second=0, microsecond=0)
             
-            record = session.query(Attendance).filter_by(employee_id=employee_id, date=today).first()
+            record = self._get_day_record(session, employee_id, today)
             
             if not record or not record.time_in:
                 raise NotClockedInError("Employee is not clocked in today.")
@@ -471,24 +599,37 @@ class AttendanceService:
             record.time_out = now
             self._calculate_all_fields(record)
             session.commit()
-            session.refresh(record)
+            self.invalidate_daily_summary(today)
             return record
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            if managed: session.close()
 
     def get_daily_summary(self, date: datetime.date, db: Optional[Session] = None) -> Dict[str, int]:
-        managed = db is None
-        session = db or self._get_session()
-        try:
-            present_count = session.query(Attendance).filter_by(date=date, status=self.STATUS_PRESENT).count()
-            total_employees = session.query(Employee).count()
+        # A caller's session may hold uncommitted changes, so it always reads (and never caches)
+        use_cache = db is None
+        if use_cache:
+            cached = self._daily_summary_cache.get(date)
+            if cached and time.monotonic() - cached[0] < self.DAILY_SUMMARY_TTL:
+                return dict(cached[1])
+        with self._session(db) as session:
+            # Both counts in one round-trip; Query.count() would also wrap each in a subquery
+            present = (session.query(func.count(Attendance.id))
+                       .filter(Attendance.date == date, Attendance.status == self.STATUS_PRESENT)
+                       .scalar_subquery())
+            total = session.query(func.count(Employee.id)).scalar_subquery()
+            present_count, total_employees = session.query(present, total).one()
             
-            return {"present": present_count, "absent": total_employees - present_count}
-        finally:
-            if managed: session.close()
+            summary = {"present": present_count, "absent": total_employees - present_count}
+            if use_cache:
+                self._daily_summary_cache[date] = (time.monotonic(), summary)
+            return dict(summary)
 
 
 attendance_service = AttendanceService()
+# Saving settings (from any writer) or reloading a changed settings file refreshes
+# the work-time values _calculate_all_fields uses
+config.add_settings_listener(attendance_service.invalidate_config_cache)
+
+# The summary's absent count depends on the number of employees
+@event.listens_for(Employee, "after_insert")
+@event.listens_for(Employee, "after_delete")
+def _invalidate_summary_on_employee_change(mapper, connection, target):
+    attendance_service.invalidate_daily_summary()
@@ -4,7 +4,7 @@ import json
 import logging
 from typing import Any, Dict
 
-from ..database import AuditLog, get_db_session
+from ..database import AuditLog, session_scope
 
 
 class AuditServiceError(Exception):
@@ -29,9 +29,7 @@ class AuditService:
             performed_by: The username of the person who performed the action.
         """
         try:
-            db_session_gen = get_db_session()
-            db_session = next(db_session_gen)
-            try:
+            with session_scope() as db_session:
                 audit_entry = AuditLog(
                     table_name=table_name,
                     record_id=record_id,
@@ -40,17 +38,10 @@ class AuditService:
                     performed_by=performed_by
                 )
                 db_session.add(audit_entry)
-                db_session.commit()
-                self.logger.info(f"Audit log entry created: {table_name} {action} ID {record_id} by {performed_by}")
-            except Exception as e:
-                db_session.rollback()
-                self.logger.error(f"Failed to create audit log entry: {e}", exc_info=True)
-                raise AuditServiceError(f"Failed to log action: {e}") from e
-            finally:
-                db_session.close()
+            self.logger.info(f"Audit log entry created: {table_name} {action} ID {record_id} by {performed_by}")
         except Exception as e:
-            self.logger.error(f"Error getting DB session for audit log: {e}", exc_info=True)
-            raise AuditServiceError(f"Failed to get DB session for audit log: {e}") from e
+            self.logger.error(f"Failed to create audit log entry: {e}", exc_info=True)
+            raise AuditServiceError(f"Failed to log action: {e}") from e
 
 
 # Global instance
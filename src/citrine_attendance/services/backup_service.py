@@ -6,10 +6,12 @@ import logging
 import os
 from pathlib import Path
 from datetime import datetime
+import sqlite3
 import tempfile
 
-from ..database import engine, BackupRecord
+from ..database import engine, BackupRecord, checkpoint_wal
 from ..config import config
+from .attendance_service import attendance_service
 from sqlalchemy.orm import sessionmaker
 
 
@@ -17,6 +19,13 @@ class BackupServiceError(Exception):
     """Base exception for backup service errors."""
     pass
 
+def _checkpoint_complete(result) -> bool:
+    """True when checkpoint_wal() left no frames behind in the WAL file."""
+    if result is None:
+        return False
+    busy, log_frames, checkpointed_frames = result
+    return busy == 0 and log_frames == checkpointed_frames
+
 class BackupService:
     """Handles creating, listing, and restoring database backups."""
 
@@ -48,10 +57,24 @@ class BackupService:
             backup_filename = f"attendance_{timestamp}.db.gz"
             backup_path = backup_dir / backup_filename
 
+            # With WAL enabled, recent commits may still live in the -wal file. A plain
+            # copy of the DB file is only complete once they have all been folded in;
+            # otherwise take a consistent snapshot through SQLite's online backup API.
+            snapshot_path = None
+            source_path = db_path
+            if not _checkpoint_complete(checkpoint_wal()):
+                self.logger.warning("WAL checkpoint incomplete; backing up through a database snapshot.")
+                snapshot_path = self._snapshot_database(db_path, backup_dir)
+                source_path = snapshot_path
+
             # Perform the backup: compress the DB file
-            with open(db_path, 'rb') as f_in:
-                with gzip.open(backup_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            try:
+                with open(source_path, 'rb') as f_in:
+                    with gzip.open(backup_path, 'wb') as f_out:
+                        shutil.copyfileobj(f_in, f_out)
+            finally:
+                if snapshot_path is not None:
+                    snapshot_path.unlink(missing_ok=True)
 
             # Get file size
             size_bytes = backup_path.stat().st_size
@@ -86,6 +109,25 @@ class BackupService:
             self.logger.error(f"Error creating backup: {e}", exc_info=True)
             raise BackupServiceError(f"Failed to create backup: {e}") from e
 
+    def _snapshot_database(self, db_path: Path, directory: Path) -> Path:
+        """Copy the live database, WAL contents included, into a temporary file in `directory`."""
+        fd, snapshot_name = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".db")
+        os.close(fd)
+        snapshot_path = Path(snapshot_name)
+        source = sqlite3.connect(db_path)
+        try:
+            target = sqlite3.connect(snapshot_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        except Exception:
+            snapshot_path.unlink(missing_ok=True)
+            raise
+        finally:
+            source.close()
+        return snapshot_path
+
     def list_backups(self):
         """Retrieve a list of backup records from the database."""
         # Use a new session
@@ -130,6 +172,15 @@ class BackupService:
                 # other actions during restore.
                 # A more robust solution involves a central connection manager.
 
+                # Empty the WAL so no stale frames are replayed onto the restored file;
+                # frames left behind would be applied on top of the backup
+                checkpoint_result = checkpoint_wal()
+                if not _checkpoint_complete(checkpoint_result):
+                    raise BackupServiceError(
+                        f"Database is still in use (WAL checkpoint result {checkpoint_result}); "
+                        "close other connections and try again."
+                    )
+
                 # Perform the restore: decompress the backup file to DB location
                 # Use a temporary file to ensure atomicity
                 temp_db_path = db_path.with_suffix(db_path.suffix + '.tmp')
@@ -143,6 +194,8 @@ class BackupService:
                     # Ensure the main app has closed its session/pool.
                     shutil.move(temp_db_path, db_path) # replace or move
 
+                    # Every cached daily summary describes the database that was just replaced
+                    attendance_service.invalidate_daily_summary()
                     self.logger.info(f"Database restored from backup: {backup_path}")
 
                 except Exception as restore_error:
@@ -51,7 +51,7 @@ class EmployeeService:
         else:
             managed_session = False
         try:
-            return db.query(Employee).filter(Employee.id == employee_id).first()
+            return db.get(Employee, employee_id)
         finally:
             if managed_session:
                 db.close()
@@ -4,7 +4,6 @@ import logging
 from pathlib import Path
 from typing import List, Dict, Any
 import datetime
-import jdatetime
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment
 from openpyxl.utils import get_column_letter
@@ -17,6 +16,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from ..config import config
 from ..utils.time_utils import minutes_to_hhmm
+from ..date_utils import gregorian_to_jalali
 from ..utils.resources import get_resource_path
 from ..locale import _
 
@@ -72,25 +72,20 @@ class ExportService:
             _("Remaining Leave This Month (min)"): _("Remaining Leave This Month (H:M)")
         }
 
+        # A report repeats the same few dozen dates, so each is formatted once
+        date_key = _("Date")
+        date_labels = {}
+
         for row in data:
             processed_row = row.copy()
             
             # Handle date formatting
-            date_key = _("Date")
             greg_date_str = processed_row.get(date_key)
             if isinstance(greg_date_str, str):
-                try:
-                    greg_date = datetime.date.fromisoformat(greg_date_str)
-                    if date_format_pref == 'jalali':
-                        processed_row[date_key] = jdatetime.date.fromgregorian(date=greg_date).strftime("%Y/%m/%d")
-                    elif date_format_pref == 'gregorian':
-                        processed_row[date_key] = greg_date.isoformat()
-                    else: 
-                        j_date_str = jdatetime.date.fromgregorian(date=greg_date).strftime("%Y/%m/%d")
-                        g_date_str = greg_date.isoformat()
-                        processed_row[date_key] = f"{j_date_str} | {g_date_str}"
-                except (ValueError, TypeError):
-                    pass # Keep original string if parsing fails
+                label = date_labels.get(greg_date_str)
+                if label is None:
+                    label = date_labels[greg_date_str] = self._format_export_date(greg_date_str, date_format_pref)
+                processed_row[date_key] = label
             
             # Handle time formatting - HEROIC IMPLEMENTATION: Include Time In 2 and Time Out 2
             for key in [_("Time In"), _("Time Out"), _("Time In 2"), _("Time Out 2")]:
@@ -107,6 +102,21 @@ class ExportService:
             processed_data.append(processed_row)
         return processed_data
 
+    def _format_export_date(self, greg_date_str: str, date_format_pref: str) -> str:
+        """Format an ISO date string for export; unparseable strings are returned unchanged."""
+        try:
+            greg_date = datetime.date.fromisoformat(greg_date_str)
+        except (ValueError, TypeError):
+            return greg_date_str # Keep original string if parsing fails
+        if date_format_pref == 'jalali':
+            return gregorian_to_jalali(greg_date).strftime("%Y/%m/%d")
+        elif date_format_pref == 'gregorian':
+            return greg_date.isoformat()
+        else:
+            j_date_str = gregorian_to_jalali(greg_date).strftime("%Y/%m/%d")
+            g_date_str = greg_date.isoformat()
+            return f"{j_date_str} | {g_date_str}"
+
     def export_to_csv(self, data: List[Dict[str, Any]], filename: Path, delimiter: str = ',') -> Path:
         """Export data to a CSV file."""
         try:
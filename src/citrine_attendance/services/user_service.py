@@ -1,4 +1,5 @@
 # src/citrine_attendance/services/user_service.py
+import datetime
 import logging
 from typing import Optional
 from sqlalchemy.orm import Session
@@ -98,7 +99,7 @@ class UserService:
             managed_session = False
 
         try:
-            user = db.query(User).filter(User.id == user_id).first()
+            user = db.get(User, user_id)
             return user
         finally:
             if managed_session:
@@ -116,8 +117,7 @@ class UserService:
             user = self.get_user_by_username(username, db)
             if user and verify_password(password, user.password_hash):
                 # Update last login time (optional)
-                import datetime
-                user.last_login = datetime.datetime.utcnow()
+                user.last_login = datetime.datetime.now(datetime.timezone.utc)
                 db.commit()
                 db.refresh(user)
                 logging.info(f"User '{username}' authenticated successfully.")
@@ -28,9 +28,11 @@ from ..locale import _
 class MainWindow(QMainWindow):
     """Main application window with a modern, light and readable UI."""
 
-    def __init__(self):
+    def __init__(self, prefetched_employees=None):
+        """prefetched_employees: optional Future with the employee list for the first dashboard paint."""
         super().__init__()
         self.logger = logging.getLogger(__name__)
+        self.prefetched_employees = prefetched_employees
         self.current_user = None
         self.backup_timer = None
         self.nav_buttons = []
@@ -180,7 +182,8 @@ class MainWindow(QMainWindow):
 
     def create_main_views(self):
         """Instantiates and adds all main views to the stacked widget."""
-        self.dashboard_view = DashboardView(self.current_user)
+        self.dashboard_view = DashboardView(self.current_user, prefetched_employees=self.prefetched_employees)
+        self.prefetched_employees = None
         self.employees_view = EmployeeView(self.current_user)
         self.attendance_view = AttendanceView(self.current_user)
         self.reports_view = ReportsView(self.current_user)
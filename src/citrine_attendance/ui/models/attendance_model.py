@@ -8,7 +8,7 @@ from PyQt6.QtGui import QColor
 from ...services.attendance_service import attendance_service
 from ...services.employee_service import employee_service
 from ...database import Attendance, get_db_session
-from ...date_utils import format_date_for_display, get_jalali_month_range
+from ...date_utils import format_dates_bulk, get_jalali_month_range
 from ...utils.time_utils import minutes_to_hhmm
 from ...locale import _
 
@@ -38,6 +38,7 @@ class AttendanceTableModel(QAbstractTableModel):
         self.logger = logging.getLogger(__name__)
         self.config = config
         self.attendance_data: List[Attendance] = []
+        self.date_labels: List[str] = []
         self.employee_cache = {}
         self.monthly_leave_cache = {}
         self.filters = {}
@@ -68,7 +69,8 @@ class AttendanceTableModel(QAbstractTableModel):
             self.employee_cache.clear()
             self.monthly_leave_cache.clear()
             
-            records = attendance_service.get_attendance_records(db=db_session, **self.filters)
+            # Display-only rows; the edit dialogs read the same attributes
+            records = attendance_service.get_attendance_records(db=db_session, raw=True, **self.filters)
 
             # Populate cache with ALL employees to handle placeholders correctly
             all_employees = employee_service.get_all_employees(db=db_session)
@@ -96,8 +98,13 @@ class AttendanceTableModel(QAbstractTableModel):
                     search_text in (r.note or "").lower()
                 ]
 
+            date_labels = format_dates_bulk(
+                (r.date for r in records), self.config.settings.get("date_format", "both")
+            )
+
             self.beginResetModel()
             self.attendance_data = records
+            self.date_labels = date_labels
             self.calculate_column_totals()
             self.endResetModel()
             self.logger.debug(f"Loaded {len(self.attendance_data)} records into model.")
@@ -106,18 +113,26 @@ class AttendanceTableModel(QAbstractTableModel):
             self.logger.error(f"Error loading attendance data: {e}", exc_info=True)
             self.beginResetModel()
             self.attendance_data = []
+            self.date_labels = []
             self.endResetModel()
         finally:
             db_session.close()
 
     def calculate_column_totals(self):
-        """Calculate the sum of specific columns."""
+        """Calculate the sum of specific columns in a single pass over the rows."""
+        tardiness = early_departure = main_work = overtime = total_duration = 0
+        for r in self.attendance_data:
+            tardiness += r.tardiness_minutes or 0
+            early_departure += r.early_departure_minutes or 0
+            main_work += r.main_work_minutes or 0
+            overtime += r.overtime_minutes or 0
+            total_duration += r.duration_minutes or 0
         self.column_totals = {
-            'tardiness': sum(r.tardiness_minutes for r in self.attendance_data if r.tardiness_minutes),
-            'early_departure': sum(r.early_departure_minutes for r in self.attendance_data if r.early_departure_minutes),
-            'main_work': sum(r.main_work_minutes for r in self.attendance_data if r.main_work_minutes),
-            'overtime': sum(r.overtime_minutes for r in self.attendance_data if r.overtime_minutes),
-            'total_duration': sum(r.duration_minutes for r in self.attendance_data if r.duration_minutes),
+            'tardiness': tardiness,
+            'early_departure': early_departure,
+            'main_work': main_work,
+            'overtime': overtime,
+            'total_duration': total_duration,
         }
 
     def rowCount(self, parent=QModelIndex()):
@@ -137,7 +152,7 @@ class AttendanceTableModel(QAbstractTableModel):
             if col == self.EMPLOYEE_NAME_COL:
                 return self.employee_cache.get(record.employee_id, {}).get("name", f"ID:{record.employee_id}")
             elif col == self.DATE_COL:
-                return format_date_for_display(record.date, format_preference=self.config.settings.get("date_format", "both"))
+                return self.date_labels[index.row()]
             elif col == self.TIME_IN_COL:
                 return record.time_in.strftime("%H:%M") if record.time_in else ""
             elif col == self.TIME_OUT_COL:
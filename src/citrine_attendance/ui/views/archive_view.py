@@ -259,39 +259,19 @@ class ArchiveView(QWidget):
             start_date_py = start_qdate.toPyDate() if not start_qdate.isNull() else None
             end_date_py = end_qdate.toPyDate() if not end_qdate.isNull() else None
 
-            # Fetch archived data for export using the service
-            db_session = attendance_service._get_session()
-            try:
-                # Note: This re-fetches data, which is fine for exports to ensure consistency.
-                # Alternatively, we could use the data already in self.archive_model.attendance_data
-                # but we'd need to convert it to the export format.
-                export_data = attendance_service.get_attendance_for_export(
-                    employee_id=selected_emp_id,
-                    start_date=start_date_py,
-                    end_date=end_date_py,
-                    db=db_session # get_attendance_for_export needs to be updated to accept an 'archived' flag or fetch from archived records
-                )
-                # TODO: Modify get_attendance_for_export or create a specific method to fetch archived data for export
-                # For now, we'll assume get_attendance_for_export can be made to work or we filter the model data.
-                # Let's filter the model data for now.
-                export_data = []
-                for record in self.archive_model.attendance_data:
-                    # Apply filters again in Python if needed, or trust the model is already filtered
-                    # For simplicity, we'll export all currently loaded archived data.
-                    # A more robust solution would re-query the service with the exact filters.
-                    record_dict = {
-                        "Date": record.date.isoformat() if record.date else "",
-                        "Employee Name": self.archive_model.employee_cache.get(record.employee_id, "Unknown"),
-                        "Time In": record.time_in.strftime("%H:%M") if record.time_in else "",
-                        "Time Out": record.time_out.strftime("%H:%M") if record.time_out else "",
-                        "Duration (min)": record.duration_minutes if record.duration_minutes is not None else "",
-                        "Status": self.archive_model.STATUS_DISPLAY.get(record.status, record.status),
-                        "Note": record.note or "",
-                    }
-                    export_data.append(record_dict)
-
-            finally:
-                db_session.close()
+            # Export the archived records already loaded (and filtered) in the view
+            export_data = []
+            for record in self.archive_model.attendance_data:
+                record_dict = {
+                    "Date": record.date.isoformat() if record.date else "",
+                    "Employee Name": self.archive_model.employee_cache.get(record.employee_id, "Unknown"),
+                    "Time In": record.time_in.strftime("%H:%M") if record.time_in else "",
+                    "Time Out": record.time_out.strftime("%H:%M") if record.time_out else "",
+                    "Duration (min)": record.duration_minutes if record.duration_minutes is not None else "",
+                    "Status": self.archive_model.STATUS_DISPLAY.get(record.status, record.status),
+                    "Note": record.note or "",
+                }
+                export_data.append(record_dict)
 
             if not export_data:
                 QMessageBox.information(self, "No Data", "There is no archived data matching the current filters to export.")
@@ -17,7 +17,7 @@ from sqlalchemy.orm import Session
 
 from ..models.attendance_model import AttendanceTableModel
 from ...services.employee_service import employee_service
-from ...database import get_db_session, Attendance
+from ...database import session_scope, Attendance
 from ...config import config
 from ..dialogs.add_attendance_dialog import AddAttendanceDialog, EditAttendanceDialog
 from ..dialogs.export_dialog import ExportDialog
@@ -186,27 +186,25 @@ class AttendanceView(QWidget):
 
     def load_filter_data(self):
         """Load data for filter controls (e.g., employee list)."""
-        db = next(get_db_session())
         try:
-            current_emp_id = self.employee_filter_combo.currentData()
-            employees = employee_service.get_all_employees(db=db)
-
-            self.employee_filter_combo.blockSignals(True)
-            self.employee_filter_combo.clear()
-            self.employee_filter_combo.addItem(_("all_employees"), None)
-            for emp in employees:
-                display_name = f"{emp.first_name} {emp.last_name}".strip() or emp.email
-                self.employee_filter_combo.addItem(display_name, emp.id)
-
-            index = self.employee_filter_combo.findData(current_emp_id)
-            if index != -1:
-                self.employee_filter_combo.setCurrentIndex(index)
-            self.employee_filter_combo.blockSignals(False)
+            with session_scope() as db:
+                current_emp_id = self.employee_filter_combo.currentData()
+                employees = employee_service.get_all_employees(db=db)
+
+                self.employee_filter_combo.blockSignals(True)
+                self.employee_filter_combo.clear()
+                self.employee_filter_combo.addItem(_("all_employees"), None)
+                for emp in employees:
+                    display_name = f"{emp.first_name} {emp.last_name}".strip() or emp.email
+                    self.employee_filter_combo.addItem(display_name, emp.id)
+
+                index = self.employee_filter_combo.findData(current_emp_id)
+                if index != -1:
+                    self.employee_filter_combo.setCurrentIndex(index)
+                self.employee_filter_combo.blockSignals(False)
         except Exception as e:
             self.logger.error(f"Error loading filter data: {e}", exc_info=True)
             QMessageBox.critical(self, _("dashboard_error"), _("error_loading_filter_data", error=e))
-        finally:
-            db.close()
 
     def load_attendance_data(self):
         """Load attendance data based on current filter settings."""
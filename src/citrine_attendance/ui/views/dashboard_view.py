@@ -9,16 +9,18 @@ from PyQt6.QtCore import Qt, QDate
 
 from ...services.employee_service import employee_service
 from ...services.attendance_service import attendance_service, AttendanceServiceError
-from ...database import get_db_session
+from ...database import session_scope
 from ...locale import _
 
 class DashboardView(QWidget):
     """The main dashboard view widget, styled by the main window's stylesheet."""
 
-    def __init__(self, current_user):
+    def __init__(self, current_user, prefetched_employees=None):
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.current_user = current_user
+        # Future with the employee list, consumed by the first refresh only
+        self._prefetched_employees = prefetched_employees
         self.init_ui()
         # Load initial data for the view
         self.refresh_data()
@@ -120,42 +122,52 @@ class DashboardView(QWidget):
 
         return clockin_groupbox
 
+    def _take_prefetched_employees(self):
+        """Return the prefetched employee list once, or None if there is none (or it failed)."""
+        future, self._prefetched_employees = self._prefetched_employees, None
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            self.logger.warning(f"Employee prefetch failed, querying again: {e}")
+            return None
+
     def refresh_data(self):
         """Refresh dashboard data like KPIs and employee list."""
         self.logger.debug("Refreshing dashboard view data.")
-        db = None
         try:
-            db = next(get_db_session())
-            # Refresh KPIs
-            today = QDate.currentDate().toPyDate()
-            summary = attendance_service.get_daily_summary(today, db=db)
-            self.kpi_present_value.setText(str(summary['present']))
-            self.kpi_absent_value.setText(str(summary['absent']))
-            self.logger.debug(f"Dashboard KPIs refreshed for {today}: {summary}")
-
-            # Refresh Employee Combo Box
-            current_selection = self.employee_combo.currentData()
-            self.employee_combo.clear()
-            self.employee_combo.addItem(_("select_employee"), None)
-            employees = employee_service.get_all_employees(db=db)
-            for emp in employees:
-                display_name = f"{emp.first_name} {emp.last_name}".strip() or emp.email
-                self.employee_combo.addItem(display_name, emp.id)
+            with session_scope() as db:
+                # Refresh KPIs
+                today = QDate.currentDate().toPyDate()
+                # No session: the summary comes from (and fills) the service's short-lived cache
+                summary = attendance_service.get_daily_summary(today)
+                self.kpi_present_value.setText(str(summary['present']))
+                self.kpi_absent_value.setText(str(summary['absent']))
+                self.logger.debug(f"Dashboard KPIs refreshed for {today}: {summary}")
+
+                # Refresh Employee Combo Box
+                current_selection = self.employee_combo.currentData()
+                self.employee_combo.clear()
+                self.employee_combo.addItem(_("select_employee"), None)
+                employees = self._take_prefetched_employees()
+                if employees is None:
+                    employees = employee_service.get_all_employees(db=db)
+                for emp in employees:
+                    display_name = f"{emp.first_name} {emp.last_name}".strip() or emp.email
+                    self.employee_combo.addItem(display_name, emp.id)
             
-            # Restore previous selection if it still exists
-            if current_selection:
-                index = self.employee_combo.findData(current_selection)
-                if index != -1:
-                    self.employee_combo.setCurrentIndex(index)
+                # Restore previous selection if it still exists
+                if current_selection:
+                    index = self.employee_combo.findData(current_selection)
+                    if index != -1:
+                        self.employee_combo.setCurrentIndex(index)
             
-            self.logger.debug(f"Employee combo box refreshed with {len(employees)} employees.")
+                self.logger.debug(f"Employee combo box refreshed with {len(employees)} employees.")
         except Exception as e:
             # HEROIC FIX: avoid recursion in Python 3.13 logging
             self.logger.error(f"Error refreshing dashboard data: {e}")
             QMessageBox.critical(self, _("error"), _("dashboard_refresh_error", error=str(e)))
-        finally:
-            if db:
-                db.close()
 
     def on_action_clicked(self, action_type: str):
         """Handle Clock In or Clock Out button clicks."""
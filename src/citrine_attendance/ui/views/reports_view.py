@@ -13,7 +13,7 @@ from ..widgets.jalali_date_edit import JalaliDateEdit
 from ...services.attendance_service import attendance_service
 from ...services.employee_service import employee_service
 from ...services.export_service import export_service, ExportServiceError
-from ...database import get_db_session
+from ...database import session_scope
 from ...locale import _, translator
 from ...utils.time_utils import minutes_to_hhmm
 
@@ -112,14 +112,13 @@ class ReportsView(QWidget):
     def load_employee_data(self):
         """Load employees into the combo box."""
         try:
-            db_session = next(get_db_session())
-            employees = employee_service.get_all_employees(db=db_session)
-            db_session.close()
-            self.employee_combo.clear()
-            self.employee_combo.addItem(_("reports_all_employees"), None)
-            for emp in employees:
-                display_name = f"{emp.first_name} {emp.last_name}".strip() or emp.email
-                self.employee_combo.addItem(display_name, emp.id)
+            with session_scope() as db_session:
+                employees = employee_service.get_all_employees(db=db_session)
+                self.employee_combo.clear()
+                self.employee_combo.addItem(_("reports_all_employees"), None)
+                for emp in employees:
+                    display_name = f"{emp.first_name} {emp.last_name}".strip() or emp.email
+                    self.employee_combo.addItem(display_name, emp.id)
         except Exception as e:
             self.logger.error(f"Error loading employees for reports: {e}", exc_info=True)
             QMessageBox.critical(self, "Error", f"Could not load employees: {e}")
@@ -131,11 +130,10 @@ class ReportsView(QWidget):
             end_date = self.end_date_edit.date().toPyDate()
             emp_id = self.employee_combo.currentData()
 
-            db_session = next(get_db_session())
-            self.last_generated_data = attendance_service.get_attendance_for_export(
-                employee_id=emp_id, start_date=start_date, end_date=end_date, db=db_session
-            )
-            db_session.close()
+            with session_scope() as db_session:
+                self.last_generated_data = attendance_service.get_attendance_for_export(
+                    employee_id=emp_id, start_date=start_date, end_date=end_date, db=db_session
+                )
 
             self.populate_preview_table()
 
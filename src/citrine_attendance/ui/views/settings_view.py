@@ -8,7 +8,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTime, pyqtSignal
 from ...config import config
 from ...services.user_service import user_service, UserServiceError
-from ...database import User, get_db_session
+from ...database import User, session_scope
 from ...locale import _, translator
 import re
 from ..widgets.custom_time_edit import CustomTimeEdit
@@ -395,12 +395,8 @@ class SettingsView(QWidget):
         try:
             # Save language selection and update translator
             chosen_lang = self.language_combo.currentData()
-            config.update_setting("language", chosen_lang)
             translator.set_language(chosen_lang)
 
-            config.update_setting("date_format", self.date_format_combo.currentData())
-            config.update_setting("workday_hours", self.workday_hours_spinbox.value())
-
             # Ensure the saved time strings use ASCII digits only (normalize)
             def _normalize_time_str_for_save(qtime):
                 s = qtime.toString("HH:mm")
@@ -412,12 +408,18 @@ class SettingsView(QWidget):
 
             start_s = _normalize_time_str_for_save(self.launch_start_edit.time())
             end_s = _normalize_time_str_for_save(self.launch_end_edit.time())
-            config.update_setting("default_launch_start_time", start_s)
-            config.update_setting("default_launch_end_time", end_s)
 
-            config.update_setting("late_threshold_time", self.late_threshold_edit.time().toString("HH:mm"))
-            config.update_setting("backup_frequency_days", self.backup_freq_spinbox.value())
-            config.update_setting("backup_retention_count", self.backup_retention_spinbox.value())
+            # Write all settings in one go instead of rewriting the file per key
+            config.update_settings({
+                "language": chosen_lang,
+                "date_format": self.date_format_combo.currentData(),
+                "workday_hours": self.workday_hours_spinbox.value(),
+                "default_launch_start_time": start_s,
+                "default_launch_end_time": end_s,
+                "late_threshold_time": self.late_threshold_edit.time().toString("HH:mm"),
+                "backup_frequency_days": self.backup_freq_spinbox.value(),
+                "backup_retention_count": self.backup_retention_spinbox.value(),
+            })
 
             QMessageBox.information(self, "Settings Saved", _("settings_saved_message"))
 
@@ -491,12 +493,9 @@ class SettingsView(QWidget):
             except Exception:
                 pass
             return
-        db = next(get_db_session())
-        try:
+        with session_scope() as db:
             users = db.query(User).all()
             self.users_list_text.setPlainText("\n".join([f"{user.username} ({user.role})" for user in users]))
-        finally:
-            db.close()
 
     def load_audit_log(self):
         if self.current_user.role != "admin":
@@ -506,9 +505,6 @@ class SettingsView(QWidget):
                 pass
             return
         from ...database import AuditLog
-        db = next(get_db_session())
-        try:
+        with session_scope() as db:
             entries = db.query(AuditLog).order_by(AuditLog.performed_at.desc()).limit(100).all()
             self.audit_log_text.setPlainText("\n".join([f"{e.performed_at} | {e.performed_by} | {e.action} on {e.table_name}:{e.record_id}" for e in entries]))
-        finally:
-            db.close()
@@ -0,0 +1,388 @@
+# tests/test_attendance_service.py
+import sys
+import os
+# Add src to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from unittest import mock
+import datetime
+import tempfile
+import shutil
+from pathlib import Path
+
+from citrine_attendance.config import config, DEFAULT_SETTINGS
+from citrine_attendance.database import init_db, session_scope, Attendance
+from citrine_attendance.date_utils import get_jalali_month_range
+from citrine_attendance.locale import _
+from citrine_attendance.services.attendance_service import attendance_service, AttendanceAlreadyExistsError
+from citrine_attendance.services.employee_service import employee_service
+
+# Columns compared between records written by different code paths
+COMPARED_FIELDS = tuple(
+    column.name for column in Attendance.__table__.columns
+    if column.name not in ("id", "created_at", "updated_at")
+)
+
+# Attributes the attendance table model and its edit dialogs read from each record
+MODEL_FIELDS = (
+    "id", "employee_id", "date", "time_in", "time_out", "time_in_2", "time_out_2",
+    "leave_start", "leave_end", "duration_minutes", "launch_duration_minutes",
+    "leave_duration_minutes", "tardiness_minutes", "early_departure_minutes",
+    "main_work_minutes", "overtime_minutes", "status", "note",
+)
+
+
+def sample_days():
+    """Time fields for one day of each shape _calculate_all_fields distinguishes."""
+    t = datetime.time
+    return [
+        dict(time_in=t(8, 30), time_out=t(17, 0)),
+        dict(time_in=t(10, 45), time_out=t(19, 30), note="late"),
+        dict(time_in=t(9, 0)),
+        dict(leave_start=t(9, 0), leave_end=t(15, 0)),
+        dict(time_in=t(9, 0), time_out=t(13, 0), time_in_2=t(16, 0), time_out_2=t(20, 15),
+             leave_start=t(13, 0), leave_end=t(14, 30)),
+        dict(time_in=t(22, 0), time_out=t(6, 0)),
+    ]
+
+
+def legacy_export_rows(service, db, **filters):
+    """The export as built before it streamed projected rows: ORM records, one leave SUM per employee and month."""
+    query = db.query(Attendance)
+    if filters.get('employee_id'): query = query.filter(Attendance.employee_id == filters['employee_id'])
+    if filters.get('start_date'): query = query.filter(Attendance.date >= filters['start_date'])
+    if filters.get('end_date'): query = query.filter(Attendance.date <= filters['end_date'])
+    export_data = []
+    for r in query.order_by(Attendance.date.desc()).all():
+        allowance = r.employee.monthly_leave_allowance_minutes if r.employee else 0
+        used_leave = service.get_monthly_leave_taken(r.employee_id, r.date, db)
+        export_data.append({
+            _("Employee Name"): f"{r.employee.first_name or ''} {r.employee.last_name or ''}".strip(),
+            _("Date"): r.date.isoformat(),
+            _("Time In"): r.time_in.strftime("%H:%M") if r.time_in else "",
+            _("Time Out"): r.time_out.strftime("%H:%M") if r.time_out else "",
+            _("Time In 2"): r.time_in_2.strftime("%H:%M") if r.time_in_2 else "",
+            _("Time Out 2"): r.time_out_2.strftime("%H:%M") if r.time_out_2 else "",
+            _("Leave (min)"): r.leave_duration_minutes or 0,
+            _("Used Leave This Month (min)"): used_leave,
+            _("Remaining Leave This Month (min)"): max(0, (allowance or 0) - used_leave),
+            _("Tardiness (min)"): r.tardiness_minutes or 0,
+            _("Early Departure (min)"): r.early_departure_minutes or 0,
+            _("Main Work (min)"): r.main_work_minutes or 0,
+            _("Overtime (min)"): r.overtime_minutes or 0,
+            _("Launch Time (min)"): r.launch_duration_minutes or 0,
+            _("Total Duration (min)"): r.duration_minutes or 0,
+            _("Status"): service.STATUS_DISPLAY.get(r.status, r.status),
+            _("Note"): r.note or "",
+        })
+    return export_data
+
+
+class TestAttendanceService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.original_user_data_dir = config.user_data_dir
+        cls.original_settings_file = config.settings_file
+        cls.original_get_db_path_method = config.get_db_path
+
+        config.user_data_dir = cls.test_dir
+        config.settings_file = cls.test_dir / "settings.json"
+        config.get_db_path = lambda: cls.test_dir / "test_attendance.db"
+        config.ensure_directories_exist()
+        config.save_settings()
+        init_db()
+
+        cls.employee_ids = [
+            employee_service.create_employee(first_name=f"Worker{i}", last_name=f"Test{i}",
+                                             email=f"worker{i}@example.com").id
+            for i in range(6)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        config.user_data_dir = cls.original_user_data_dir
+        config.settings_file = cls.original_settings_file
+        config.get_db_path = cls.original_get_db_path_method
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+
+    def setUp(self):
+        attendance_service.invalidate_daily_summary()
+
+    def _rows(self, start_date, end_date):
+        """Stored rows in the date range as comparable tuples, ordered by employee and date."""
+        with session_scope() as db:
+            records = (db.query(Attendance)
+                       .filter(Attendance.date.between(start_date, end_date))
+                       .order_by(Attendance.employee_id, Attendance.date)
+                       .all())
+            return [tuple(getattr(r, f) for f in COMPARED_FIELDS) for r in records]
+
+    def _shifted(self, rows, days):
+        """rows with their date column moved by `days`, for comparing two date ranges."""
+        date_index = COMPARED_FIELDS.index("date")
+        return [row[:date_index] + (row[date_index] + datetime.timedelta(days=days),) + row[date_index + 1:]
+                for row in rows]
+
+    # --- work-time settings ---
+
+    def test_saved_work_time_settings_apply_without_manual_refresh(self):
+        """Settings saved through config reach _calculate_all_fields with no explicit invalidation."""
+        day = datetime.date(2024, 9, 2)
+        emp_id = self.employee_ids[5]
+        self.addCleanup(config.update_settings, {
+            key: config.settings[key] for key in ("workday_hours", "late_threshold_time")
+        })
+
+        config.update_settings({"workday_hours": 7, "late_threshold_time": "09:00"})
+        record = attendance_service.add_manual_attendance(employee_id=emp_id, date=day,
+                                                          time_in=datetime.time(9, 30), time_out=datetime.time(18, 0))
+        # 09:00 threshold; end of work 09:00 + 7 h + the 2 h default lunch window = 18:00
+        self.assertEqual((record.tardiness_minutes, record.early_departure_minutes,
+                          record.overtime_minutes, record.main_work_minutes), (30, 0, 0, 390))
+
+    def test_legacy_work_time_keys_are_ignored(self):
+        """Only workday_hours and late_threshold_time, the keys the settings view saves, drive the calculation."""
+        day = datetime.date(2024, 9, 3)
+        emp_id = self.employee_ids[5]
+        self.addCleanup(attendance_service.invalidate_config_cache)
+        # Keys the calculation read before chunk4-1; nothing in the app writes them
+        legacy = {"workday_duration": 6, "late_threshold": "08:00"}
+        current = {key: DEFAULT_SETTINGS[key] for key in (
+            "workday_hours", "late_threshold_time", "default_launch_start_time", "default_launch_end_time")}
+        with mock.patch.dict(config.settings, dict(current, **legacy)):
+            attendance_service.invalidate_config_cache()
+            record = attendance_service.add_manual_attendance(employee_id=emp_id, date=day,
+                                                              time_in=datetime.time(9, 30), time_out=datetime.time(18, 0))
+        # 10:00 threshold and 8 h day: on time, and 2 h short of 10:00 + 8 h + 2 h lunch
+        self.assertEqual((record.tardiness_minutes, record.early_departure_minutes,
+                          record.overtime_minutes, record.main_work_minutes), (0, 120, 0, 360))
+
+    # --- bulk_create_attendance ---
+
+    def test_bulk_create_matches_single_insert_fields(self):
+        """Derived fields from bulk_create_attendance match add_manual_attendance."""
+        single_day = datetime.date(2024, 1, 10)
+        bulk_day = datetime.date(2024, 1, 20)
+        samples = list(zip(self.employee_ids, sample_days()))
+
+        for emp_id, data in samples:
+            attendance_service.add_manual_attendance(**dict(data, employee_id=emp_id, date=single_day))
+        inserted = attendance_service.bulk_create_attendance(
+            [dict(data, employee_id=emp_id, date=bulk_day) for emp_id, data in samples]
+        )
+
+        self.assertEqual(inserted, len(samples))
+        single_rows = self._rows(single_day, single_day)
+        self.assertEqual(len(single_rows), len(samples))
+        self.assertEqual(self._shifted(single_rows, 10), self._rows(bulk_day, bulk_day))
+        statuses = {row[COMPARED_FIELDS.index("status")] for row in single_rows}
+        self.assertEqual(statuses, {"present", "partial", "on_leave"})
+        self.assertTrue(any(row[COMPARED_FIELDS.index("tardiness_minutes")] for row in single_rows))
+
+    def test_bulk_create_spans_several_batches(self):
+        """Inputs larger than BULK_INSERT_BATCH_SIZE are inserted completely."""
+        start = datetime.date(2024, 2, 1)
+        records = [
+            dict(employee_id=self.employee_ids[0], date=start + datetime.timedelta(days=i),
+                 time_in=datetime.time(9, 0), time_out=datetime.time(17, 30))
+            for i in range(11)
+        ]
+        with mock.patch.object(type(attendance_service), "BULK_INSERT_BATCH_SIZE", 4):
+            inserted = attendance_service.bulk_create_attendance(records)
+
+        self.assertEqual(inserted, 11)
+        rows = self._rows(start, start + datetime.timedelta(days=10))
+        self.assertEqual([row[COMPARED_FIELDS.index("date")] for row in rows],
+                         [r["date"] for r in records])
+
+    def test_bulk_import_skips_duplicates(self):
+        """add_manual_attendance_many skips rows already stored or repeated in the input."""
+        day = datetime.date(2024, 3, 5)
+        emp_a, emp_b = self.employee_ids[:2]
+        attendance_service.add_manual_attendance(employee_id=emp_a, date=day,
+                                                 time_in=datetime.time(8, 0), time_out=datetime.time(16, 0))
+        before = self._rows(day, day)
+
+        inserted = attendance_service.add_manual_attendance_many([
+            dict(employee_id=emp_a, date=day, time_in=datetime.time(11, 0)),
+            dict(employee_id=emp_b, date=day, time_in=datetime.time(9, 0)),
+            dict(employee_id=emp_b, date=day, time_in=datetime.time(12, 0)),
+        ])
+
+        self.assertEqual(inserted, 1)
+        rows = self._rows(day, day)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0], before[0])
+        self.assertEqual(rows[1][COMPARED_FIELDS.index("time_in")], datetime.time(9, 0))
+
+    # --- add_manual_attendance_many ---
+
+    def test_import_matches_repeated_manual_adds(self):
+        """add_manual_attendance_many stores the same rows as one add_manual_attendance per record."""
+        manual_start = datetime.date(2024, 4, 1)
+        import_start = datetime.date(2024, 4, 11)
+        samples = sample_days()
+
+        for i, data in enumerate(samples):
+            attendance_service.add_manual_attendance(
+                **dict(data, employee_id=self.employee_ids[i], date=manual_start + datetime.timedelta(days=i)))
+        inserted = attendance_service.add_manual_attendance_many([
+            dict(data, employee_id=self.employee_ids[i], date=import_start + datetime.timedelta(days=i))
+            for i, data in enumerate(samples)
+        ])
+
+        self.assertEqual(inserted, len(samples))
+        manual_rows = self._rows(manual_start, manual_start + datetime.timedelta(days=9))
+        import_rows = self._rows(import_start, import_start + datetime.timedelta(days=9))
+        self.assertEqual(len(manual_rows), len(samples))
+        self.assertEqual(self._shifted(manual_rows, 10), import_rows)
+
+    def test_import_duplicate_handled_like_manual_add(self):
+        """A duplicate leaves the stored row untouched: add_manual_attendance raises, the import skips it."""
+        day = datetime.date(2024, 5, 7)
+        emp_id = self.employee_ids[2]
+        attendance_service.add_manual_attendance(employee_id=emp_id, date=day,
+                                                 time_in=datetime.time(8, 0), time_out=datetime.time(16, 0))
+        stored = self._rows(day, day)
+        duplicate = dict(employee_id=emp_id, date=day, time_in=datetime.time(10, 30), note="duplicate")
+
+        with self.assertRaises(AttendanceAlreadyExistsError):
+            attendance_service.add_manual_attendance(**duplicate)
+        self.assertEqual(self._rows(day, day), stored)
+
+        self.assertEqual(attendance_service.add_manual_attendance_many([duplicate]), 0)
+        self.assertEqual(self._rows(day, day), stored)
+
+    # --- get_daily_summary cache ---
+
+    def _insert_behind_service(self, **data):
+        """Store a present record without going through the service, so nothing invalidates the cache."""
+        with session_scope() as db:
+            db.add(Attendance(status="present", **data))
+
+    def test_daily_summary_cache_hit_and_expiry(self):
+        """Summaries are reused within DAILY_SUMMARY_TTL and re-read once it has passed."""
+        day = datetime.date(2024, 6, 3)
+        first = attendance_service.get_daily_summary(day)
+        self.assertEqual(first["present"], 0)
+
+        self._insert_behind_service(employee_id=self.employee_ids[0], date=day)
+        self.assertEqual(attendance_service.get_daily_summary(day), first)
+
+        with mock.patch.object(type(attendance_service), "DAILY_SUMMARY_TTL", 0.0):
+            self.assertEqual(attendance_service.get_daily_summary(day)["present"], 1)
+
+    def test_daily_summary_bypasses_cache_with_session(self):
+        """A caller-supplied session always reads the database and never fills the cache."""
+        day = datetime.date(2024, 6, 4)
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 0)
+        self._insert_behind_service(employee_id=self.employee_ids[0], date=day)
+
+        with session_scope() as db:
+            self.assertEqual(attendance_service.get_daily_summary(day, db=db)["present"], 1)
+            db.add(Attendance(employee_id=self.employee_ids[1], date=day, status="present"))
+            db.flush()
+            self.assertEqual(attendance_service.get_daily_summary(day, db=db)["present"], 2)
+            db.rollback()
+
+        # The uncommitted count above was not cached
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 0)
+
+    def test_daily_summary_invalidated_by_writes(self):
+        """Creating, updating and deleting attendance drop the cached summary."""
+        day = datetime.date(2024, 6, 5)
+        emp_id = self.employee_ids[3]
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 0)
+
+        record = attendance_service.add_manual_attendance(employee_id=emp_id, date=day,
+                                                          time_in=datetime.time(8, 0), time_out=datetime.time(16, 0))
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 1)
+
+        attendance_service.update_attendance(record.id, time_out=None)
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 0)
+
+        attendance_service.update_attendance(record.id, time_out=datetime.time(17, 0))
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 1)
+
+        attendance_service.delete_attendance(record.id)
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 0)
+
+        attendance_service.bulk_create_attendance([
+            dict(employee_id=emp_id, date=day, time_in=datetime.time(8, 0), time_out=datetime.time(16, 0))
+        ])
+        self.assertEqual(attendance_service.get_daily_summary(day)["present"], 1)
+
+    # --- get_attendance_records(raw=True) ---
+
+    def _assert_raw_matches_orm(self, **filters):
+        orm_records = attendance_service.get_attendance_records(**filters)
+        raw_records = attendance_service.get_attendance_records(raw=True, **filters)
+        self.assertTrue(orm_records)
+        self.assertEqual(
+            [tuple(getattr(r, f) for f in MODEL_FIELDS) for r in raw_records],
+            [tuple(getattr(r, f) for f in MODEL_FIELDS) for r in orm_records],
+        )
+
+    def test_raw_records_match_orm_records(self):
+        """raw=True returns the same values as ORM records for every field the table model reads."""
+        start = datetime.date(2024, 7, 1)
+        attendance_service.bulk_create_attendance([
+            dict(data, employee_id=self.employee_ids[i], date=start + datetime.timedelta(days=i % 3),
+                 note=data.get("note", f"row {i}"))
+            for i, data in enumerate(sample_days())
+        ])
+        end = start + datetime.timedelta(days=4)
+
+        # Date range across employees
+        self._assert_raw_matches_orm(start_date=start, end_date=end)
+        # One employee's range, absent days filled with placeholders
+        self._assert_raw_matches_orm(employee_id=self.employee_ids[1], start_date=start, end_date=end)
+        # Status filter
+        self._assert_raw_matches_orm(start_date=start, end_date=end, statuses=["present"])
+
+    # --- iter_attendance_for_export ---
+
+    def test_export_matches_legacy_rows(self):
+        """Streamed export rows equal the old ORM-built rows, across several EXPORT_BATCH_SIZE batches."""
+        exporters = [
+            employee_service.create_employee(first_name="Export", last_name=f"Person{i}",
+                                             email=f"export{i}@example.com",
+                                             monthly_leave_allowance_hours=hours)
+            for i, hours in enumerate((0, 12))
+        ]
+        samples = sample_days()
+        # Crosses a leave period boundary (periods start on Jalali day 29; 2024-07-19 is 1403/04/29),
+        # and 2024-07-18 falls outside the range computed for it
+        start = datetime.date(2024, 7, 15)
+        records = [
+            dict(samples[i % len(samples)], employee_id=emp.id, date=start + datetime.timedelta(days=i))
+            for emp in exporters for i in range(14)
+        ]
+        attendance_service.bulk_create_attendance(records)
+        self.assertNotEqual(get_jalali_month_range(start)[0],
+                            get_jalali_month_range(start + datetime.timedelta(days=13))[0])
+
+        in_range = dict(start_date=start + datetime.timedelta(days=2), end_date=start + datetime.timedelta(days=12))
+        for filters in (in_range, dict(in_range, employee_id=exporters[1].id)):
+            with mock.patch.object(type(attendance_service), "EXPORT_BATCH_SIZE", 3):
+                streamed = list(attendance_service.iter_attendance_for_export(**filters))
+            with session_scope() as db:
+                expected = legacy_export_rows(attendance_service, db, **filters)
+
+            self.assertGreater(len(streamed), 3)
+            sort_key = lambda row: (row[_("Date")], row[_("Employee Name")])
+            self.assertEqual(sorted(streamed, key=sort_key), sorted(expected, key=sort_key))
+            dates = [row[_("Date")] for row in streamed]
+            self.assertEqual(dates, sorted(dates, reverse=True))
+            self.assertTrue(all(in_range["start_date"].isoformat() <= d <= in_range["end_date"].isoformat()
+                                for d in dates))
+
+        names = {row[_("Employee Name")] for row in attendance_service.get_attendance_for_export(**in_range)}
+        self.assertTrue({"Export Person0", "Export Person1"} <= names)
+
+
+if __name__ == '__main__':
+    unittest.main()
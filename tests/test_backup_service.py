@@ -0,0 +1,107 @@
+# tests/test_backup_service.py
+import sys
+import os
+# Add src to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from unittest import mock
+import gzip
+import sqlite3
+import tempfile
+import shutil
+from pathlib import Path
+
+from citrine_attendance import database
+from citrine_attendance.config import config
+from citrine_attendance.services import backup_service as backup_module
+from citrine_attendance.services.backup_service import backup_service, BackupServiceError
+from citrine_attendance.services.employee_service import employee_service
+
+
+class TestBackupService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.original_user_data_dir = config.user_data_dir
+        cls.original_settings_file = config.settings_file
+        cls.original_get_db_path_method = config.get_db_path
+
+        config.user_data_dir = cls.test_dir
+        config.settings_file = cls.test_dir / "settings.json"
+        cls.db_path = cls.test_dir / "test_attendance.db"
+        config.get_db_path = lambda: cls.db_path
+        config.ensure_directories_exist()
+        config.save_settings()
+        database.init_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        config.user_data_dir = cls.original_user_data_dir
+        config.settings_file = cls.original_settings_file
+        config.get_db_path = cls.original_get_db_path_method
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+
+    def setUp(self):
+        # The service binds the engine at import; use the one init_db() built for this test
+        patcher = mock.patch.object(backup_module, "engine", database.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _backup_emails(self, backup_path):
+        """Employee emails stored in a gzipped backup."""
+        restored = self.test_dir / "unpacked.db"
+        with gzip.open(backup_path, 'rb') as f_in, open(restored, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        conn = sqlite3.connect(restored)
+        try:
+            return {row[0] for row in conn.execute("SELECT email FROM employees")}
+        finally:
+            conn.close()
+            restored.unlink()
+
+    def _leftover_snapshots(self):
+        return [p.name for p in backup_service.get_backup_dir().iterdir() if p.name.startswith(".snapshot-")]
+
+    def test_checkpoint_reports_frames(self):
+        """checkpoint_wal() returns SQLite's (busy, log, checkpointed) counts."""
+        employee_service.create_employee(first_name="Wal", email="wal@example.com")
+        result = database.checkpoint_wal()
+        self.assertEqual(len(result), 3)
+        self.assertTrue(backup_module._checkpoint_complete(result))
+        self.assertFalse(backup_module._checkpoint_complete((1, 4, 2)))
+        self.assertFalse(backup_module._checkpoint_complete(None))
+
+    def test_backup_contains_latest_commit(self):
+        """A backup taken after a complete checkpoint holds the newest rows."""
+        employee_service.create_employee(first_name="Copy", email="copy@example.com")
+        backup_path = backup_service.create_backup(manual=True)
+        self.assertIn("copy@example.com", self._backup_emails(backup_path))
+
+    def test_backup_with_incomplete_checkpoint_uses_snapshot(self):
+        """When WAL frames remain, the backup is taken through SQLite's backup API and still holds them."""
+        employee_service.create_employee(first_name="Snapshot", email="snapshot@example.com")
+        with mock.patch.object(backup_module, "checkpoint_wal", return_value=(1, 8, 3)), \
+                mock.patch.object(backup_service, "_snapshot_database",
+                                  wraps=backup_service._snapshot_database) as snapshot:
+            backup_path = backup_service.create_backup(manual=True)
+
+        snapshot.assert_called_once()
+        self.assertIn("snapshot@example.com", self._backup_emails(backup_path))
+        self.assertEqual(self._leftover_snapshots(), [])
+
+    def test_restore_refuses_incomplete_checkpoint(self):
+        """Restore fails, leaving the database file alone, while WAL frames cannot be checkpointed."""
+        backup_path = backup_service.create_backup(manual=True)
+        record_id = max(b.id for b in backup_service.list_backups() if b.file_path == str(backup_path))
+        before = self.db_path.read_bytes()
+
+        with mock.patch.object(backup_module, "checkpoint_wal", return_value=(1, 8, 3)):
+            with self.assertRaises(BackupServiceError):
+                backup_service.restore_backup(record_id)
+        self.assertEqual(self.db_path.read_bytes(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# tests/test_config.py
+import sys
+import os
+# Add src to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from unittest import mock
+import json
+import tempfile
+import shutil
+from pathlib import Path
+
+from citrine_attendance.config import AppConfig, DEFAULT_SETTINGS
+
+
+class TestAppConfigSettings(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        # Point the per-user data directory at the temporary directory
+        patcher = mock.patch.object(AppConfig, "user_data_dir", self.test_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.test_dir, True)
+        self.config = AppConfig()
+        self.settings_file = self.test_dir / "settings.json"
+
+    def _read_file(self):
+        with open(self.settings_file, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_externally(self, settings):
+        """Rewrite settings.json as another process would, with a distinct mtime."""
+        previous_mtime = os.stat(self.settings_file).st_mtime_ns
+        with open(self.settings_file, "w", encoding="utf-8") as f:
+            json.dump(settings, f)
+        os.utime(self.settings_file, ns=(previous_mtime + 1_000_000_000, previous_mtime + 1_000_000_000))
+
+    def _leftover_temp_files(self):
+        return [p.name for p in self.test_dir.iterdir() if p.name.startswith(".settings-")]
+
+    def test_first_load_writes_defaults(self):
+        """Without a settings file the defaults are used and saved."""
+        self.assertEqual(self.config.settings, DEFAULT_SETTINGS)
+        self.assertEqual(self._read_file(), DEFAULT_SETTINGS)
+
+    def test_load_reuses_cache_until_file_changes(self):
+        """An unchanged file is not parsed again; an external edit is picked up."""
+        first = self.config.load_settings()
+        with mock.patch("builtins.open", side_effect=AssertionError("settings file re-read")):
+            self.assertIs(self.config.load_settings(), first)
+
+        self._write_externally(dict(DEFAULT_SETTINGS, workday_hours=6))
+        self.assertEqual(self.config.load_settings()["workday_hours"], 6)
+
+    def test_external_edit_keeps_defaults_for_missing_keys(self):
+        """A file with only some keys is merged over the defaults."""
+        self._write_externally({"language": "fa"})
+        settings = self.config.load_settings()
+        self.assertEqual(settings["language"], "fa")
+        self.assertEqual(settings["workday_hours"], DEFAULT_SETTINGS["workday_hours"])
+
+    def test_save_then_load_round_trips(self):
+        """Saved settings come back unchanged from a fresh AppConfig."""
+        self.config.update_settings({"language": "fa", "holidays": ["01-01"], "workday_hours": 7})
+        self.assertEqual(self._read_file()["language"], "fa")
+
+        reloaded = AppConfig()
+        self.assertEqual(reloaded.settings, self.config.settings)
+        self.assertEqual(reloaded.settings["holidays"], ["01-01"])
+        self.assertEqual(self._leftover_temp_files(), [])
+
+    def test_update_settings_ignores_unknown_keys(self):
+        """Unknown keys are not saved, and an update with only unknown keys does not write."""
+        with mock.patch.object(self.config, "save_settings") as save:
+            self.config.update_settings({"no_such_setting": 1})
+        save.assert_not_called()
+
+        self.config.update_settings({"no_such_setting": 1, "workday_hours": 9})
+        saved = self._read_file()
+        self.assertEqual(saved["workday_hours"], 9)
+        self.assertNotIn("no_such_setting", saved)
+
+    def test_failed_replace_keeps_original_file(self):
+        """If the temp file cannot replace settings.json, the old file stays and the temp file is removed."""
+        original = self._read_file()
+        with mock.patch("citrine_attendance.config.os.replace", side_effect=OSError("disk full")):
+            self.config.update_setting("workday_hours", 4)
+
+        self.assertEqual(self._read_file(), original)
+        self.assertEqual(self._leftover_temp_files(), [])
+
+    def test_failed_serialisation_keeps_original_file(self):
+        """A value that cannot be serialised raises without touching settings.json or leaving a temp file."""
+        original = self._read_file()
+        self.config.settings["language"] = object()
+        with self.assertRaises(TypeError):
+            self.config.save_settings()
+
+        self.assertEqual(self._read_file(), original)
+        self.assertEqual(self._leftover_temp_files(), [])
+
+    def test_listeners_follow_saves_and_external_edits(self):
+        """Listeners run after a save and after re-reading a changed file, not on a cache hit."""
+        listener = mock.Mock()
+        self.config.add_settings_listener(listener)
+
+        self.config.update_setting("workday_hours", 6)
+        self.assertEqual(listener.call_count, 1)
+
+        self.config.load_settings()
+        self.assertEqual(listener.call_count, 1)
+
+        self._write_externally(dict(DEFAULT_SETTINGS, workday_hours=5))
+        self.config.load_settings()
+        self.assertEqual(listener.call_count, 2)
+
+    def test_failing_listener_does_not_break_save(self):
+        """A listener that raises is logged, and the save and later listeners still go through."""
+        later = mock.Mock()
+        self.config.add_settings_listener(mock.Mock(side_effect=RuntimeError("boom")))
+        self.config.add_settings_listener(later)
+
+        self.config.update_setting("language", "fa")
+        self.assertEqual(self._read_file()["language"], "fa")
+        later.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()
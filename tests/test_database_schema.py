@@ -0,0 +1,177 @@
+# tests/test_database_schema.py
+import sys
+import os
+# Add src to the path so we can import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from unittest import mock
+import sqlite3
+import tempfile
+import shutil
+from pathlib import Path
+
+from sqlalchemy import text
+from citrine_attendance import database
+from citrine_attendance.config import config
+
+# The attendance/employees layout from before the migrated columns were added
+BASELINE_SCHEMA = """
+CREATE TABLE employees (
+    id INTEGER PRIMARY KEY,
+    first_name VARCHAR NOT NULL,
+    last_name VARCHAR,
+    email VARCHAR UNIQUE,
+    phone VARCHAR,
+    employee_id VARCHAR UNIQUE,
+    notes TEXT,
+    created_at DATETIME,
+    updated_at DATETIME
+);
+CREATE TABLE attendance (
+    id INTEGER PRIMARY KEY,
+    employee_id INTEGER NOT NULL REFERENCES employees(id),
+    date DATE NOT NULL,
+    time_in TIME,
+    time_out TIME,
+    launch_start TIME,
+    launch_end TIME,
+    duration_minutes INTEGER,
+    status VARCHAR,
+    note TEXT,
+    created_by VARCHAR,
+    created_at DATETIME,
+    updated_at DATETIME
+);
+"""
+
+
+class TestDatabaseSchema(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = Path(tempfile.mkdtemp())
+        cls.original_get_db_path_method = config.get_db_path
+        cls.db_path = cls.test_dir / "schema_test.db"
+        config.get_db_path = lambda: cls.db_path
+
+    @classmethod
+    def tearDownClass(cls):
+        config.get_db_path = cls.original_get_db_path_method
+        shutil.rmtree(cls.test_dir, ignore_errors=True)
+
+    def setUp(self):
+        self._dispose()
+        for suffix in ("", "-wal", "-shm"):
+            path = Path(f"{self.db_path}{suffix}")
+            if path.exists():
+                path.unlink()
+
+    def tearDown(self):
+        self._dispose()
+
+    def _dispose(self):
+        if database.engine is not None:
+            database.engine.dispose()
+
+    def _create_baseline(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(BASELINE_SCHEMA)
+        conn.close()
+
+    def _inspect(self):
+        """Return (attendance columns, index names, user_version) read straight from the file."""
+        self._dispose()
+        conn = sqlite3.connect(self.db_path)
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(attendance)")}
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+        return columns, indexes, version
+
+    def test_fresh_database_gets_current_version(self):
+        """A new file gets every table and index and is stamped with SCHEMA_VERSION."""
+        database.init_db()
+
+        columns, indexes, version = self._inspect()
+        self.assertEqual(version, database.SCHEMA_VERSION)
+        self.assertEqual(columns, {c.name for c in database.Attendance.__table__.columns})
+        expected_indexes = {i.name for t in database.Base.metadata.sorted_tables for i in t.indexes}
+        self.assertTrue(expected_indexes <= indexes)
+
+    def test_baseline_database_is_upgraded(self):
+        """A baseline-era file gets renamed and added columns, current indexes and SCHEMA_VERSION."""
+        self._create_baseline()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO employees (id, first_name, email) VALUES (1, 'Old', 'old@example.com')")
+        conn.execute("INSERT INTO attendance (employee_id, date, launch_start, status) "
+                      "VALUES (1, '2023-01-01', '14:00:00', 'present')")
+        conn.commit()
+        conn.close()
+
+        database.init_db()
+
+        columns, indexes, version = self._inspect()
+        self.assertEqual(version, database.SCHEMA_VERSION)
+        self.assertEqual(columns, {c.name for c in database.Attendance.__table__.columns})
+        self.assertIn("idx_attendance_date_status", indexes)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute("SELECT leave_start, is_archived FROM attendance").fetchone()
+            allowance = conn.execute("SELECT monthly_leave_allowance_minutes FROM employees").fetchone()
+        finally:
+            conn.close()
+        self.assertEqual(row, ("14:00:00", 0))
+        self.assertEqual(allowance, (0,))
+
+    def test_current_database_skips_reflection(self):
+        """At SCHEMA_VERSION, init_db neither runs create_all nor inspects the schema."""
+        database.init_db()
+        self._dispose()
+
+        with mock.patch.object(database.Base.metadata, "create_all") as create_all, \
+                mock.patch.object(database, "inspect") as inspect:
+            database.init_db()
+        create_all.assert_not_called()
+        inspect.assert_not_called()
+        self.assertIsNotNone(database.SessionLocal)
+
+    def test_failed_migration_rolls_back(self):
+        """A failing migration step leaves no earlier column, index or version change behind."""
+        self._create_baseline()
+        failing = {"broken": text("ALTER TABLE no_such_table ADD COLUMN broken INTEGER")}
+        with mock.patch.object(database, "_EMPLOYEE_MIGRATIONS", failing):
+            database.init_db()
+
+        columns, indexes, version = self._inspect()
+        self.assertIn("launch_start", columns)
+        self.assertNotIn("leave_start", columns)
+        self.assertNotIn("is_archived", columns)
+        self.assertNotIn("idx_attendance_date_status", indexes)
+        self.assertEqual(version, 0)
+
+    def test_dropped_index_is_removed_on_upgrade(self):
+        """Indexes removed from the models are dropped from databases that still carry them."""
+        database.init_db()
+        self._dispose()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "CREATE INDEX idx_attendance_active_date_emp ON attendance (date, employee_id) "
+            "WHERE is_archived = 0"
+        )
+        conn.execute(f"PRAGMA user_version = {database.SCHEMA_VERSION - 1}")
+        conn.commit()
+        conn.close()
+
+        database.init_db()
+
+        _, indexes, version = self._inspect()
+        self.assertNotIn("idx_attendance_active_date_emp", indexes)
+        self.assertIn("idx_attendance_date", indexes)
+        self.assertEqual(version, database.SCHEMA_VERSION)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -178,6 +178,19 @@ class TestEmployeeCRUD(unittest.TestCase):
             employee_service.delete_employee(non_existent_id)
         print("Correctly handled deletion of non-existent employee.")
 
+    def test_10_updated_at_loaded_after_commit(self):
+        """Test that updated_at stays readable on an employee updated in a closed session."""
+        from citrine_attendance.database import session_scope, Employee
+        emp = employee_service.create_employee(first_name="Frank", email="frank.timestamp@example.com")
+
+        with session_scope() as db:
+            loaded = db.get(Employee, emp.id)
+            loaded.phone = "555-0100"
+
+        # The session is closed; updated_at must not need a reload from the database
+        self.assertIsNotNone(loaded.updated_at)
+        print(f"Employee ID {emp.id} updated_at: {loaded.updated_at}")
+
     # Note: CSV import test would require creating a temporary CSV file.
     # It's a good test to add later.
 